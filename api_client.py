@@ -0,0 +1,154 @@
+import logging
+import time
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import circuit_breaker
+import metrics
+from circuit_breaker import CircuitOpenError
+from config import BACK_URL, BACK_POOL_SIZE, BACK_RETRIES, BACK_HTTP2
+from config import LIVE_DEADLINE, PHOTO_DEADLINE, ATTEND_DEADLINE, BACKGROUND_DEADLINE
+
+log = logging.getLogger(__name__)
+
+# 엔드포인트별 (연결, 응답) 타임아웃(초)
+TIMEOUTS = {
+    "/regist": (3.05, 60),
+    "/predict": (3.05, 60),
+    "/predict_many": (3.05, 60),
+    "/predict_batch": (3.05, 60),
+    "/attendance_month": (3.05, 30),
+    "/attendance_debug": (3.05, 60),
+}
+DEFAULT_TIMEOUT = (3.05, 60)
+# Idempotency-Key 가 있는 요청만 이 상태 코드에서 다시 보낸다
+RETRY_STATUS = frozenset({502, 503, 504})
+RETRY_BACKOFF = 0.3
+
+# 용도별 전체 응답 마감(초). 이 시간이 지나면 기다리지 않고 포기한다
+DEADLINES = {
+    "live": LIVE_DEADLINE,
+    "photo": PHOTO_DEADLINE,
+    "attendance": ATTEND_DEADLINE,
+    "background": BACKGROUND_DEADLINE,
+}
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """마감 시간이 지나 요청을 보내지 않음"""
+
+
+def _enable_http2():
+    # urllib3의 실험적 HTTP/2 지원 (https 연결에서 ALPN으로 협상)
+    try:
+        import urllib3.http2
+        urllib3.http2.inject_into_urllib3()
+    except ImportError:
+        log.warning("h2 패키지가 없어 HTTP/1.1로 동작합니다.")
+        return False
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def get_session():
+    """
+    프로세스 전체에서 공유하는 커넥션 풀.
+    매 요청마다 TCP/TLS 핸드셰이크를 하지 않도록 keep-alive 연결을 재사용한다.
+    """
+    if BACK_HTTP2:
+        _enable_http2()
+
+    # 연결 실패는 항상 안전하게 재시도, 응답 읽기 실패는 중복 등록을 막기 위해 재시도하지 않음.
+    # 502/503/504 는 게이트웨이 뒤에서 이미 처리됐을 수 있어 여기서는 재시도하지 않는다 (post 참고)
+    retry = Retry(
+        total=BACK_RETRIES,
+        connect=BACK_RETRIES,
+        read=0,
+        status=0,
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=0.3,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=BACK_POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def url_for(endpoint):
+    return BACK_URL.rstrip("/") + endpoint
+
+
+def deadline(use_case):
+    """용도별 마감 시각(time.monotonic 기준). 여러 번 나눠 보내는 요청도 같은 마감을 공유할 수 있다."""
+    return time.monotonic() + DEADLINES[use_case]
+
+
+def _timeout_until(endpoint, timeout, deadline_at):
+    connect, read = timeout or TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    if deadline_at is None:
+        return connect, read
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"{endpoint}: 마감 시간이 지나 요청을 보내지 않았습니다")
+    return min(connect, remaining), min(read, remaining)
+
+
+def post(endpoint, data=None, files=None, timeout=None, headers=None, stream=False, deadline=None):
+    """
+    deadline: 이 시각까지 응답이 없으면 포기한다 (api_client.deadline(용도)).
+    백엔드 상태가 나빠 브레이커가 열려 있으면 보내지 않고 CircuitOpenError 를 낸다.
+    stream=True 면 본문을 읽기 전에 돌려준다 (측정 시간도 헤더 수신까지).
+    headers 에 Idempotency-Key 가 있으면 502/503/504 에서 BACK_RETRIES 번까지 다시 보낸다.
+    키가 없는 요청은 백엔드가 이미 처리했을 수 있으므로(중복 등록/출석) 다시 보내지 않는다.
+    """
+    if isinstance(timeout, (int, float)):
+        timeout = (timeout, timeout)
+    retries = BACK_RETRIES if headers and "Idempotency-Key" in headers else 0
+    attempt = 0
+    while True:
+        resp = _post_once(endpoint, data, files, _timeout_until(endpoint, timeout, deadline), headers, stream,
+                          deadline)
+        if attempt >= retries or resp.status_code not in RETRY_STATUS:
+            return resp
+        wait = RETRY_BACKOFF * 2 ** attempt
+        if deadline is not None and time.monotonic() + wait >= deadline:
+            return resp
+        resp.close()
+        time.sleep(wait)
+        attempt += 1
+
+
+def _post_once(endpoint, data, files, timeout, headers, stream, deadline):
+    status = "error"
+    with circuit_breaker.get_breaker().call() as call:
+        start = time.perf_counter()
+        try:
+            resp = get_session().post(
+                url_for(endpoint),
+                data=data,
+                files=files,
+                timeout=timeout,
+                headers=headers,
+                stream=stream,
+            )
+            status = resp.status_code
+            # 4xx 는 요청 문제이지 백엔드 장애가 아니다
+            call.done(status < 500)
+            return resp
+        except requests.exceptions.RequestException:
+            if deadline is not None and time.monotonic() >= deadline - 0.05:
+                # 이 호출의 마감 때문에 끊은 것: 백엔드 오류가 아니라 걸린 시간으로만 판단한다
+                call.timed_out()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            registry = metrics.get_metrics()
+            registry.observe("app_request_seconds", elapsed, endpoint=endpoint)
+            metrics.observe("network", elapsed)
+            registry.inc("app_requests_total", endpoint=endpoint, status=status)
@@ -0,0 +1,298 @@
+import calendar
+import contextvars
+import datetime as dt
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import requests
+import streamlit as st
+from cachetools import TLRUCache
+
+import api_client
+from config import ATTEND_CACHE_SIZE, ATTEND_PAST_TTL, ATTEND_CURRENT_TTL, ROSTER_WORKERS
+
+log = logging.getLogger(__name__)
+
+ATTEND_PATH = "/attendance_month"
+NDJSON = "application/x-ndjson"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+ATTEND_SCHEMA = pa.schema([
+    ("student_id", pa.string()),
+    ("timestamp", pa.timestamp("s")),
+    ("date", pa.date32()),
+])
+# 형식 이름 → (확장자, MIME)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def next_month(y, m):
+    return (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def month_range(start_date, end_date):
+    # start~end 사이의 (년, 월) 목록
+    ym = (start_date.year, start_date.month)
+    while ym <= (end_date.year, end_date.month):
+        yield ym
+        ym = next_month(*ym)
+
+
+def month_bounds(y, m):
+    return dt.date(y, m, 1), dt.date(y, m, calendar.monthrange(y, m)[1])
+
+
+class MonthCache:
+    """
+    (학번, 년, 월, 시작 시각, 종료 시각) 단위의 출석 기록 캐시.
+    지난 달은 바뀌지 않으므로 오래 두고, 이번 달(과 이후)은 짧은 TTL 로 자주 갱신한다.
+    """
+
+    def __init__(self, maxsize=ATTEND_CACHE_SIZE):
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._ttu, timer=time.time)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ttu(key, value, now):
+        _, y, m, _, _ = key
+        today = dt.date.today()
+        ttl = ATTEND_CURRENT_TTL if (y, m) >= (today.year, today.month) else ATTEND_PAST_TTL
+        return now + ttl
+
+    def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def put(self, key, rows):
+        with self._lock:
+            self._cache[key] = rows
+
+
+@st.cache_resource(show_spinner=False)
+def get_month_cache():
+    return MonthCache()
+
+
+def _post_range(student_id, start_date, end_date, start_time, end_time):
+    """
+    기간의 출석 기록을 한 줄씩 내보낸다. 서버 응답 형식에 따라
+    - NDJSON 스트림(Content-Type: application/x-ndjson): 한 줄에 row 하나, 받는 대로
+    - 페이지: {"rows": [...], "next_cursor": ...} 를 cursor 로 이어서 요청
+    - 예전 형식: {"rows": [...]} 한 번에
+    스트림/페이지 응답은 시간순이어야 한다 (달이 바뀌면 앞 달이 끝난 것으로 본다).
+    """
+    data = {
+        "student_id": student_id,
+        "start_date": start_date.isoformat(),               # YYYY-MM-DD
+        "end_date":   end_date.isoformat(),                 # YYYY-MM-DD
+        "start_time": start_time.strftime("%H:%M:%S"),      # HH:MM:SS
+        "end_time":   end_time.strftime("%H:%M:%S"),        # HH:MM:SS
+    }
+    headers = {"Accept": f"{NDJSON}, application/json"}
+    deadline = api_client.deadline("attendance")     # 여러 페이지를 나눠 받아도 전체가 한 마감을 공유
+    cursor = None
+    while True:
+        page = dict(data, cursor=cursor) if cursor else data
+        with api_client.post(ATTEND_PATH, data=page, headers=headers, stream=True, deadline=deadline) as resp:
+            resp.raise_for_status()
+            if resp.headers.get("Content-Type", "").startswith(NDJSON):
+                for line in resp.iter_lines():
+                    if line:
+                        yield json.loads(line)
+                return
+            body = resp.json()
+        cursor = body.get("next_cursor")
+        rows = body.get("rows", [])
+        if cursor is None and page is data:
+            # 한 번에 받은 예전 형식은 정렬을 보장하지 않는다
+            rows.sort(key=lambda r: r.get("timestamp") or "")
+        yield from rows
+        if not cursor:
+            return
+
+
+def _row_month(row):
+    ts = row.get("timestamp") or ""
+    return (int(ts[:4]), int(ts[5:7])) if len(ts) >= 7 else None
+
+
+def _iter_run(student_id, run, start_time, end_time):
+    # 연속된 달 묶음을 한 번에 요청하고, 다음 달 기록이 오면 앞 달을 완성된 것으로 보고 바로 내보낸다
+    first, _ = month_bounds(*run[0])
+    _, last = month_bounds(*run[-1])
+    pending = {ym: [] for ym in run}
+    order = iter(run)
+    current = next(order)
+    for row in _post_range(student_id, first, last, start_time, end_time):
+        ym = _row_month(row)
+        if ym not in pending:
+            continue
+        while current < ym:
+            yield current, pending.pop(current)
+            current = next(order)
+        pending[ym].append(row)
+    yield current, pending.pop(current)
+    for ym in order:
+        yield ym, pending.pop(ym)
+
+
+def iter_months(student_id, start_date, end_date, start_time, end_time, cache):
+    """
+    달마다 (년월, start_date~end_date 범위의 rows, 캐시 여부) 를 순서대로 내보낸다.
+    캐시에 없는 달만 서버에 요청하며, 연속된 빈 달은 한 번의 요청으로 묶는다.
+    요청은 항상 월 단위(1일~말일)로 해서 캐시를 채우고, 받은 달은 전체 응답을 기다리지 않고 바로 내보낸다.
+    """
+    tkey = (start_time.strftime("%H:%M:%S"), end_time.strftime("%H:%M:%S"))
+    months = list(month_range(start_date, end_date))
+    lo, hi = start_date.isoformat(), end_date.isoformat()
+
+    def trim(rows):
+        # 월 단위로 받아온 것을 요청한 날짜 범위로 자르기 (ISO 문자열 비교)
+        return [row for row in rows if lo <= (row.get("timestamp") or "")[:10] <= hi]
+
+    i = 0
+    while i < len(months):
+        rows = cache.get((student_id,) + months[i] + tkey)
+        if rows is not None:
+            yield months[i], trim(rows), True
+            i += 1
+            continue
+        # 여기부터 캐시에 없는 연속된 달
+        run = [months[i]]
+        while i + len(run) < len(months) and cache.get((student_id,) + months[i + len(run)] + tkey) is None:
+            run.append(months[i + len(run)])
+        for ym, rows in _iter_run(student_id, run, start_time, end_time):
+            cache.put((student_id,) + ym + tkey, rows)
+            yield ym, trim(rows), False
+        i += len(run)
+
+
+def fetch_roster(student_ids, start_date, end_date, start_time, end_time, cache, workers=ROSTER_WORKERS):
+    """
+    학생별 조회를 bounded thread pool 로 동시에 보내고, 끝나는 순서대로 (학번, [RecordBatch], 오류) 를 돌려준다.
+    받은 달은 바로 Arrow 배치로 바꾸므로 학생 전체 기록을 dict 목록으로 들고 있지 않는다.
+    """
+    def one(sid):
+        batches = []
+        try:
+            for _, rows, _ in iter_months(sid, start_date, end_date, start_time, end_time, cache):
+                batches.extend(iter_record_batches(iter_timestamps({sid: rows})))
+            return sid, batches, None
+        except requests.exceptions.RequestException as e:
+            return sid, batches, str(e)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for fut in as_completed([pool.submit(contextvars.copy_context().run, one, sid) for sid in student_ids]):
+            yield fut.result()
+
+
+def iter_timestamps(rows_by_student):
+    for sid, rows in rows_by_student.items():
+        for row in rows:
+            ts = row.get("timestamp")
+            if ts:
+                yield sid, ts
+
+
+def parse_timestamps(stamps):
+    """
+    timestamp 문자열 목록 → (timestamp[s] 배열, 파싱 성공 mask).
+    소수점 초("... 17:23:37.123456")와 ISO 형식("2025-11-03T17:23:37")도 받도록
+    앞 19자만 잘라 "T" 를 공백으로 바꾼 뒤 파싱한다. 그래도 읽을 수 없는 값은 건너뛴다.
+    """
+    text = pc.utf8_slice_codeunits(pa.array(stamps, pa.string()), 0, 19)
+    text = pc.replace_substring(text, "T", " ")
+    parsed = pc.strptime(text, format=TIMESTAMP_FORMAT, unit="s", error_is_null=True)
+    valid = pc.is_valid(parsed)
+    bad = len(parsed) - pc.sum(valid).as_py() if len(parsed) else 0
+    if bad:
+        log.warning("timestamp %d건을 읽지 못해 건너뜁니다 (예: %r)", bad,
+                    next(ts for ts, ok in zip(stamps, valid.to_pylist()) if not ok))
+    return parsed, valid
+
+
+def _to_batch(ids, stamps):
+    # timestamp 파싱은 pyarrow compute 로 배치 단위 한 번에 처리
+    parsed, valid = parse_timestamps(stamps)
+    ids = pa.array(ids, pa.string())
+    if not pc.all(valid).as_py():
+        ids, parsed = ids.filter(valid), parsed.filter(valid)
+    return pa.record_batch([ids, parsed, pc.cast(parsed, pa.date32())], schema=ATTEND_SCHEMA)
+
+
+def iter_record_batches(pairs, batch_size=65536):
+    """(학번, timestamp) 쌍을 batch_size 개씩 Arrow RecordBatch 로 묶어서 내보낸다."""
+    ids, stamps = [], []
+    for sid, ts in pairs:
+        ids.append(sid)
+        stamps.append(ts)
+        if len(ids) >= batch_size:
+            yield _to_batch(ids, stamps)
+            ids, stamps = [], []
+    if ids:
+        yield _to_batch(ids, stamps)
+
+
+def day_times(rows):
+    """
+    한 달치 rows → {날짜: ["HH:MM", ...]} (같은 시:분은 1회만, 받은 순서대로).
+    문자열을 한 줄씩 split 하지 않고 pyarrow 로 한 번에 파싱한다.
+    """
+    stamps = [row["timestamp"] for row in rows if row.get("timestamp")]
+    if not stamps:
+        return {}
+    parsed, valid = parse_timestamps(stamps)
+    parsed = parsed.filter(valid)
+    times = {}
+    for d, hm in zip(pc.cast(parsed, pa.date32()).to_pylist(), pc.strftime(parsed, format="%H:%M").to_pylist()):
+        day = times.setdefault(d, [])
+        if hm not in day:
+            day.append(hm)
+    return times
+
+
+def batches_to_table(batches):
+    return pa.Table.from_batches(batches, schema=ATTEND_SCHEMA)
+
+
+def export_attendance(batches, fmt):
+    """
+    RecordBatch 를 하나씩 writer 에 흘려 보내 CSV / Parquet / Arrow IPC 파일 바이트를 만든다.
+    전체 기록을 한 번에 테이블로 만들지 않는다.
+    """
+    sink = pa.BufferOutputStream()
+    if fmt == "Parquet":
+        writer = pq.ParquetWriter(sink, ATTEND_SCHEMA, compression="zstd")
+    elif fmt == "Arrow IPC":
+        writer = pa.ipc.new_file(sink, ATTEND_SCHEMA)
+    else:
+        writer = pa_csv.CSVWriter(sink, ATTEND_SCHEMA)
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def attendance_matrix(table, student_ids, start_date, end_date):
+    """
+    학생 × 날짜 출석 여부(bool) 행렬과 학생별/날짜별 출석률을 계산한다.
+    같은 날 여러 번 찍힌 기록은 1회로 본다.
+    """
+    days = pd.date_range(start_date, end_date, freq="D").date
+    df = table.select(["student_id", "date"]).to_pandas().drop_duplicates()
+    matrix = (
+        pd.crosstab(df["student_id"], df["date"]).gt(0)
+        .reindex(index=list(student_ids), columns=days, fill_value=False)
+    )
+    return matrix, matrix.mean(axis=1), matrix.mean(axis=0)
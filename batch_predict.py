@@ -0,0 +1,83 @@
+import contextvars
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+import api_client
+import result_cache
+from config import BATCH_WORKERS
+from image_prep import prepare_upload
+
+API_PATH = '/predict_many'
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def iter_images(uploads):
+    # 업로드된 이미지와 ZIP 안의 이미지를 (이름, 파일 객체) 로 풀어낸다
+    for up in uploads:
+        if up.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(up) as zf:
+                for name in sorted(zf.namelist()):
+                    if name.lower().endswith(IMAGE_EXTS) and not os.path.basename(name).startswith("."):
+                        fp = io.BytesIO(zf.read(name))
+                        fp.name = name
+                        yield name, fp
+        else:
+            yield up.name, up
+
+
+def predict_one(name, fp, cache):
+    row = {"image": name, "ok": False, "known": None, "unknown": None, "detail": [], "cached": False, "error": ""}
+    try:
+        prepared = prepare_upload(fp)
+        key = result_cache.content_key(API_PATH, prepared.data)
+        cached = cache.get(key)
+        if cached:
+            data, _ = cached
+            row["cached"] = True
+        else:
+            resp = api_client.post(API_PATH, files={"file": prepared.file_part()}, deadline=api_client.deadline("photo"))
+            if not resp.ok:
+                row["error"] = f"{resp.status_code} {resp.text[:200]}"
+                return row
+            data = resp.json()
+            cache.put(key, data)
+    except requests.exceptions.RequestException as e:
+        row["error"] = f"네트워크 오류: {e}"
+        return row
+    except Exception as e:
+        row["error"] = f"이미지 오류: {e}"
+        return row
+
+    if not isinstance(data, dict):
+        row["error"] = "응답을 해석할 수 없습니다"
+        return row
+    row.update(ok=True, known=data.get("known"), unknown=data.get("unknown"), detail=data.get("detail") or [])
+    return row
+
+
+def run_batch(images, cache, workers=BATCH_WORKERS):
+    """이미지마다 /predict_many 를 동시에 호출하고, 끝나는 순서대로 결과 행을 돌려준다."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, predict_one, name, fp, cache) for name, fp in images]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def summarize(rows):
+    # 전체 이미지에서 인식된 학생을 중복 없이 모으고, 학생별 최고 점수와 등장 이미지 수를 계산
+    seen = {}
+    for row in rows:
+        for dic in row["detail"]:
+            name = dic.get("student_name")
+            if not name or name == "unknown":
+                continue
+            sid = dic.get("student_id") or name
+            entry = seen.setdefault(sid, {"student_id": sid, "student_name": name, "max_score": 0.0, "images": set()})
+            entry["max_score"] = max(entry["max_score"], dic.get("score") or 0.0)
+            entry["images"].add(row["image"])
+    summary = [{**e, "images": len(e["images"])} for e in seen.values()]
+    return sorted(summary, key=lambda e: e["max_score"], reverse=True)
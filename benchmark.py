@@ -0,0 +1,260 @@
+"""
+페이지별 지연 시간 / 처리량 / 메모리 벤치마크.
+
+가짜 백엔드(stub_backend)를 같은 프로세스 안에 띄우고, 폼 페이지는 Streamlit AppTest 로,
+실시간 카메라 페이지는 합성 영상 프레임을 VideoProcessor.recv 에 직접 넣어서 잰다.
+    python benchmark.py --iterations 20 --latency 0.05
+    python benchmark.py --save bench.json
+    python benchmark.py --compare bench.json --tolerance 0.25    # p95 가 25% 이상 느려지면 종료 코드 1
+"""
+import argparse
+import datetime as dt
+import io
+import json
+import os
+import runpy
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import stub_backend
+
+PAGES = {
+    "regist": "pages/2) 내 얼굴 등록/사진으로_등록.py",
+    "predict_many": "pages/3) 얼굴 확인/사진으로_확인_(n명).py",
+    "camera_one": "pages/3) 얼굴 확인/카메라로_확인_(1명).py",
+    "camera_many": "pages/3) 얼굴 확인/카메라로_확인_(n명).py",
+    "attendance_debug": "pages/4) 출석체크/디버그용_출석_확인.py",
+    "attendance_month": "pages/4) 출석체크/월별출석확인.py",
+    "attendance_roster": "pages/4) 출석체크/반_전체_출석현황.py",
+}
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def measure(name, fn, iterations, stub, warmup=1):
+    """
+    fn(i) 를 반복 실행해 p50/p95 지연, 처리량, 최대 메모리(tracemalloc), 백엔드 요청 수를 잰다.
+    fn.reset 이 있으면 매 실행 전에(측정 시간 밖에서) 불러 캐시를 비운다 — 백엔드 경로를 재기 위해.
+    """
+    reset = getattr(fn, "reset", None) or (lambda: None)
+    for i in range(warmup):
+        reset()
+        fn(-1 - i)
+    before = sum(stub.counts.values())
+    latencies = []
+    busy = 0.0
+    for i in range(iterations):
+        reset()
+        t = time.perf_counter()
+        measured = fn(i)            # fn 이 직접 잰 시간(초)을 돌려주면 그 값을 사용
+        spent = time.perf_counter() - t
+        busy += spent
+        latencies.append(measured if isinstance(measured, float) else spent)
+    requests_made = sum(stub.counts.values()) - before
+
+    # 메모리는 추적 오버헤드가 커서 지연 측정과 분리해 한 번 더 실행
+    reset()
+    tracemalloc.start()
+    fn(iterations)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "throughput": iterations / busy,
+        "peak_mb": peak / 2**20,
+        "requests": requests_made,
+    }
+
+
+# ---------------------------
+# AppTest 로 돌리는 폼 페이지
+# ---------------------------
+def bench_attendance_month(i):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(PAGES["attendance_month"], default_timeout=60).run()
+    today = dt.date.today()
+    at.text_input[0].input(f"S{i % 5:04d}")
+    at.date_input[0].set_value(today - dt.timedelta(days=180))
+    at.date_input[1].set_value(today)
+    at.button[0].click().run()
+    assert not at.exception, at.exception
+
+
+def clear_month_cache():
+    import attendance
+    attendance.get_month_cache.clear()
+
+
+bench_attendance_month.reset = clear_month_cache
+
+
+def bench_attendance_debug(i):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(PAGES["attendance_debug"], default_timeout=60).run()
+    at.text_input[0].input(f"S{i % 5:04d}")
+    at.button[0].click().run()
+    assert not at.exception, at.exception
+
+
+def make_roster_bench(students):
+    def bench_attendance_roster(i):
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_file(PAGES["attendance_roster"], default_timeout=120).run()
+        at.text_area[0].input("\n".join(f"S{n:04d}" for n in range(students)))
+        at.button[0].click().run()
+        assert not at.exception, at.exception
+    bench_attendance_roster.reset = clear_month_cache
+    return bench_attendance_roster
+
+
+# ---------------------------
+# 파일 업로드 페이지 (AppTest 가 file_uploader 를 지원하지 않아 페이지가 쓰는 경로를 직접 호출)
+# ---------------------------
+def make_photo(width=4000, height=3000):
+    rng = np.random.default_rng(0)
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.fromarray(rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)).resize((width, height)).save(buf, "JPEG")
+    buf.name = "photo.jpg"
+    return buf
+
+
+def make_regist_bench():
+    import api_client
+    from image_prep import prepare_upload
+    photo = make_photo()
+
+    def bench_regist(i):
+        files = {"file": prepare_upload(photo).file_part()}
+        api_client.post("/regist", data={"student_name": "bench", "student_id": f"S{i}"}, files=files).raise_for_status()
+    return bench_regist
+
+
+def make_predict_many_bench():
+    import api_client
+    import overlay
+    from image_prep import prepare_upload
+    photo = make_photo()
+
+    def bench_predict_many(i):
+        prepared = prepare_upload(photo)
+        resp = api_client.post("/predict_many", files={"file": prepared.file_part()})
+        resp.raise_for_status()
+        overlay.draw_detections(np.asarray(prepared.image), resp.json()["detail"])
+    return bench_predict_many
+
+
+# ---------------------------
+# 실시간 카메라 페이지: 합성 프레임 드라이버
+# ---------------------------
+def load_video_processor(page):
+    # 페이지를 실행하되 webrtc_streamer 는 호출하지 않고 video_processor_factory 만 가져온다
+    import streamlit_webrtc
+    captured = {}
+    original = streamlit_webrtc.webrtc_streamer
+    streamlit_webrtc.webrtc_streamer = lambda *args, **kwargs: captured.update(kwargs)
+    try:
+        runpy.run_path(page)
+    finally:
+        streamlit_webrtc.webrtc_streamer = original
+    return captured["video_processor_factory"]
+
+
+def synthetic_faces(img, **kwargs):
+    # 합성 프레임의 밝은 사각형을 얼굴로 간주 (Haar 검출기 대신)
+    ys, xs = np.nonzero(img[::4, ::4, 1] > 200)
+    if len(xs) == 0:
+        return []
+    return [[int(xs.min()) * 4, int(ys.min()) * 4, int(xs.max()) * 4 + 4, int(ys.max()) * 4 + 4]]
+
+
+def make_video_bench(page, fps):
+    import av
+    import face_crop
+    face_crop.detect_faces = synthetic_faces
+    processor = load_video_processor(page)()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def bench_frame(i):
+        # 얼굴이 좌우로 움직이고 주기적으로 화면 밖으로 나갔다 들어온다
+        frame[:] = 30
+        x = (i * 7) % 800
+        if x < 540:
+            frame[150:300, x:x + 100] = 230
+        t = time.perf_counter()
+        processor.recv(av.VideoFrame.from_ndarray(frame, format="bgr24"))
+        elapsed = time.perf_counter() - t
+        time.sleep(max(0.0, 1 / fps - elapsed))     # 실제 카메라처럼 fps 에 맞춰 프레임 공급
+        return elapsed
+    bench_frame.close = processor.on_ended
+    return bench_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="페이지별 성능 벤치마크 (가짜 백엔드 사용)")
+    stub_backend.add_stub_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=10, help="페이지당 반복 횟수")
+    parser.add_argument("--frames", type=int, default=150, help="카메라 페이지에 넣을 프레임 수")
+    parser.add_argument("--fps", type=float, default=30.0, help="합성 프레임 속도")
+    parser.add_argument("--students", type=int, default=100, help="반 전체 조회 학생 수")
+    parser.add_argument("--only", nargs="*", choices=list(PAGES), help="일부 페이지만 실행")
+    parser.add_argument("--save", help="결과를 JSON 으로 저장")
+    parser.add_argument("--compare", help="기준 JSON 과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용할 p95 증가 비율")
+    args = parser.parse_args()
+
+    stub = stub_backend.stub_from_args(args)
+    port, stop = stub_backend.start_in_thread(stub)
+    os.environ["BACK_URL"] = f"http://127.0.0.1:{port}"     # config import 전에 설정
+
+    scenarios = {
+        "regist": lambda: (make_regist_bench(), args.iterations),
+        "predict_many": lambda: (make_predict_many_bench(), args.iterations),
+        "camera_one": lambda: (make_video_bench(PAGES["camera_one"], args.fps), args.frames),
+        "camera_many": lambda: (make_video_bench(PAGES["camera_many"], args.fps), args.frames),
+        "attendance_debug": lambda: (bench_attendance_debug, args.iterations),
+        "attendance_month": lambda: (bench_attendance_month, args.iterations),
+        "attendance_roster": lambda: (make_roster_bench(args.students), max(1, args.iterations // 5)),
+    }
+    results = []
+    try:
+        for name in args.only or list(PAGES):
+            fn, iterations = scenarios[name]()
+            results.append(measure(name, fn, iterations, stub))
+            if hasattr(fn, "close"):
+                fn.close()
+    finally:
+        stop()
+
+    print(f"{'page':<20}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}{'peak MB':>10}{'requests':>10}")
+    for r in results:
+        print(f"{r['name']:<20}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['throughput']:>10.1f}"
+              f"{r['peak_mb']:>10.1f}{r['requests']:>10}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({r["name"]: r for r in results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = [
+            f"{r['name']}: p95 {baseline[r['name']]['p95_ms']:.1f} → {r['p95_ms']:.1f} ms"
+            for r in results
+            if r["name"] in baseline and r["p95_ms"] > baseline[r["name"]]["p95_ms"] * (1 + args.tolerance)
+        ]
+        if regressions:
+            print("⚠️ 성능 회귀:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"✅ 기준 대비 p95 +{args.tolerance:.0%} 이내")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import contextvars
+import csv
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+import api_client
+from config import BULK_WORKERS, BULK_MANIFEST_DIR
+from image_prep import prepare_upload
+
+API_PATH = '/regist'
+ROSTER_COLUMNS = ("student_name", "student_id", "filename")
+
+
+def read_roster(roster_bytes):
+    # BOM 이 붙은 엑셀 CSV 도 읽을 수 있도록 utf-8-sig 사용
+    reader = csv.DictReader(io.StringIO(roster_bytes.decode("utf-8-sig")))
+    missing = [c for c in ROSTER_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV 에 필수 컬럼이 없습니다: {', '.join(missing)}")
+    return [
+        {c: (row.get(c) or "").strip() for c in ROSTER_COLUMNS}
+        for row in reader
+        if any((row.get(c) or "").strip() for c in ROSTER_COLUMNS)
+    ]
+
+
+class Manifest:
+    """
+    업로드 결과를 한 줄씩 기록하는 JSON Lines 파일.
+    같은 ZIP + CSV 로 다시 실행하면 성공한 항목은 건너뛴다.
+    """
+
+    def __init__(self, run_id, directory=BULK_MANIFEST_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self.done = set()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue        # 중단 시 마지막 줄이 잘렸을 수 있음
+                    if rec.get("ok"):
+                        self.done.add(self.key(rec))
+
+    @staticmethod
+    def key(row):
+        return f"{row['student_id']}/{row['filename']}"
+
+    def record(self, row, ok, message):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**row, "ok": ok, "message": message, "at": time.time()}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if ok:
+            self.done.add(self.key(row))
+
+
+def run_id_for(zip_bytes, roster_bytes):
+    h = hashlib.sha256()
+    h.update(roster_bytes)
+    h.update(zip_bytes)
+    return h.hexdigest()[:16]
+
+
+def _register_one(zf, members, row):
+    member = members.get(row["filename"]) or members.get(os.path.basename(row["filename"]))
+    if member is None:
+        return row, False, "ZIP 안에 파일이 없습니다"
+    try:
+        with zf.open(member) as fp:
+            prepared = prepare_upload(io.BytesIO(fp.read()))
+        prepared.filename = os.path.basename(member)
+        data = {"student_name": row["student_name"], "student_id": row["student_id"]}
+        resp = api_client.post(API_PATH, data=data, files={"file": prepared.file_part()},
+                               deadline=api_client.deadline("background"))
+    except requests.exceptions.RequestException as e:
+        return row, False, f"네트워크 오류: {e}"
+    except Exception as e:
+        return row, False, f"이미지 오류: {e}"
+    if not resp.ok:
+        return row, False, f"실패: {resp.status_code} {resp.text[:200]}"
+    return row, True, "성공"
+
+
+def run_bulk(zip_file, rows, manifest, workers=BULK_WORKERS):
+    """
+    아직 성공하지 않은 행만 bounded thread pool 로 업로드하고, 끝나는 순서대로 (row, ok, message) 를 돌려준다.
+    결과는 끝나는 즉시 manifest 에 기록되므로 중간에 멈춰도 다음 실행에서 이어서 진행한다.
+    """
+    todo = [row for row in rows if Manifest.key(row) not in manifest.done]
+    with zipfile.ZipFile(zip_file) as zf:
+        members = {}
+        for name in zf.namelist():
+            if not name.endswith("/"):
+                members.setdefault(name, name)
+                members.setdefault(os.path.basename(name), name)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, _register_one, zf, members, row) for row in todo]
+            for fut in as_completed(futures):
+                row, ok, message = fut.result()
+                manifest.record(row, ok, message)
+                yield row, ok, message
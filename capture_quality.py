@@ -0,0 +1,70 @@
+import cv2
+import numpy as np
+
+import face_crop
+
+PATCH = 128                     # 선명도/밝기를 비교할 얼굴 패치 크기 (모든 프레임을 같은 크기로 맞춰 한 번에 계산)
+IDEAL_BRIGHTNESS = 0.5          # 0~1, 얼굴 평균 밝기의 목표
+MIN_FACE_RATIO = 0.05           # 얼굴 넓이 / 프레임 넓이 가 이 이상이면 크기 점수 만점
+WEIGHTS = {"sharpness": 0.5, "brightness": 0.25, "face_size": 0.25}
+
+
+def _face_patches(frames, is_rgb):
+    # 프레임마다 가장 큰 얼굴을 찾아 PATCH×PATCH 그레이스케일로. 얼굴이 없으면 None
+    patches, boxes = [], []
+    for img in frames:
+        found = face_crop.detect_faces(img, is_rgb=is_rgb)
+        if not found:
+            patches.append(None)
+            boxes.append(None)
+            continue
+        box = max(found, key=lambda b: (b[2] - b[0]) * (b[3] - b[1]))
+        crop = face_crop.largest_face_crop(img, [box], pad=0.1)
+        gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY if is_rgb else cv2.COLOR_BGR2GRAY)
+        patches.append(cv2.resize(gray, (PATCH, PATCH), interpolation=cv2.INTER_AREA))
+        boxes.append(box)
+    return patches, boxes
+
+
+def laplacian_variance(stack):
+    # stack: (N, H, W) float32 → (N,) 4-이웃 라플라시안 분산 (클수록 선명)
+    lap = (stack[:, 1:-1, :-2] + stack[:, 1:-1, 2:] + stack[:, :-2, 1:-1] + stack[:, 2:, 1:-1]
+           - 4 * stack[:, 1:-1, 1:-1])
+    return lap.reshape(len(stack), -1).var(axis=1)
+
+
+def score_frames(frames, is_rgb=True):
+    """
+    연속 촬영한 프레임들의 등록 적합도를 매긴다.
+    반환: 프레임 순서대로 {index, sharpness, brightness, face_ratio, score, box} (얼굴이 없으면 score 0)
+    선명도는 같은 묶음 안에서 가장 선명한 프레임 대비 비율로 정규화한다.
+    """
+    patches, boxes = _face_patches(frames, is_rgb)
+    found = [i for i, p in enumerate(patches) if p is not None]
+    rows = [{"index": i, "sharpness": 0.0, "brightness": 0.0, "face_ratio": 0.0, "score": 0.0, "box": None}
+            for i in range(len(frames))]
+    if not found:
+        return rows
+
+    stack = np.stack([patches[i] for i in found]).astype(np.float32)
+    sharpness = laplacian_variance(stack)
+    brightness = stack.mean(axis=(1, 2)) / 255.0
+    areas = np.array([(boxes[i][2] - boxes[i][0]) * (boxes[i][3] - boxes[i][1]) for i in found], dtype=np.float32)
+    frame_areas = np.array([frames[i].shape[0] * frames[i].shape[1] for i in found], dtype=np.float32)
+    face_ratio = areas / frame_areas
+
+    sharp_score = sharpness / max(float(sharpness.max()), 1e-6)
+    bright_score = np.clip(1.0 - np.abs(brightness - IDEAL_BRIGHTNESS) / IDEAL_BRIGHTNESS, 0.0, 1.0)
+    size_score = np.clip(face_ratio / MIN_FACE_RATIO, 0.0, 1.0)
+    score = (WEIGHTS["sharpness"] * sharp_score + WEIGHTS["brightness"] * bright_score
+             + WEIGHTS["face_size"] * size_score)
+
+    for k, i in enumerate(found):
+        rows[i].update(sharpness=float(sharpness[k]), brightness=float(brightness[k]),
+                       face_ratio=float(face_ratio[k]), score=float(score[k]), box=boxes[i])
+    return rows
+
+
+def best_k(rows, k):
+    # 얼굴이 있는 프레임 중 점수가 높은 k 개 (점수 순)
+    return sorted((r for r in rows if r["box"] is not None), key=lambda r: r["score"], reverse=True)[:k]
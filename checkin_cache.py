@@ -0,0 +1,45 @@
+import threading
+import time
+
+import streamlit as st
+from cachetools import TTLCache
+
+import metrics
+from config import CHECKIN_TTL, CHECKIN_CACHE_SIZE
+
+
+class CheckinCache:
+    """
+    키오스크별로 최근 출석 확인된 학생 캐시. 세션 간 공유되므로 lock 으로 보호한다.
+    ttl 안에 같은 학생이 다시 인식되면 백엔드 호출(과 출석 기록)을 생략하고 캐시된 결과를 보여준다.
+    """
+
+    def __init__(self, maxsize=CHECKIN_CACHE_SIZE, ttl=CHECKIN_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, kiosk, student_id):
+        # (항목, 경과 초) 또는 None. 항목: {student_id, student_name, score, checked_at}
+        with self._lock:
+            entry = self._cache.get((kiosk, student_id))
+        if entry is None:
+            return None
+        return entry, time.time() - entry["checked_at"]
+
+    def put(self, kiosk, student_id, student_name=None, score=None):
+        with self._lock:
+            # 이미 있으면 처음 확인한 시각을 유지 (TTL 은 처음 확인 기준)
+            if (kiosk, student_id) in self._cache:
+                return
+            self._cache[(kiosk, student_id)] = {
+                "student_id": student_id, "student_name": student_name, "score": score, "checked_at": time.time(),
+            }
+
+    def suppress(self, kiosk):
+        # 캐시 덕분에 생략한 요청 수
+        metrics.get_metrics().inc("app_checkin_suppressed_total", kiosk=kiosk)
+
+
+@st.cache_resource(show_spinner=False)
+def get_checkin_cache():
+    return CheckinCache()
@@ -0,0 +1,158 @@
+"""
+백엔드 호출 서킷 브레이커.
+
+최근 window 초 동안의 호출 결과를 보고 오류 비율이나 느린 응답 비율이 기준을 넘으면 열린다(open).
+열려 있는 동안은 요청을 보내지 않고 바로 CircuitOpenError 를 낸다. cooldown 초가 지나면
+반열림(half-open) 상태에서 probes 개의 요청만 시험 삼아 보내고, 성공하면 닫고 실패하면 다시 연다.
+
+호출은 항상 `with breaker.call() as call:` 안에서 보낸다. 블록이 어떻게 끝나든(예외 포함)
+결과가 기록되고 시험 요청 자리가 반납되므로, 반열림 상태에서 영영 막히는 일이 없다.
+"""
+import collections
+import contextlib
+import threading
+import time
+
+import requests
+import streamlit as st
+
+import metrics
+from config import (BREAKER_WINDOW, BREAKER_MIN_CALLS, BREAKER_ERROR_RATE, BREAKER_SLOW_SECONDS,
+                    BREAKER_SLOW_RATE, BREAKER_COOLDOWN, BREAKER_PROBES)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """브레이커가 열려 있어 요청을 보내지 않음"""
+
+
+class Call:
+    """
+    브레이커를 통과한 호출 하나의 결과.
+
+    - done(ok): 응답을 받음 (ok=False 면 5xx 같은 백엔드 오류)
+    - timed_out(): 호출한 쪽의 마감 때문에 끊음. 백엔드 오류로 세지 않고 걸린 시간(느림 여부)만 반영한다
+    - 아무것도 남기지 않고 블록이 끝나면 실패로 기록한다
+    """
+
+    def __init__(self, probe):
+        self.probe = probe              # 반열림 상태에서 허용된 시험 요청이면 그 세대 번호, 아니면 None
+        self.ok = None
+        self.inconclusive = False
+        self.start = time.perf_counter()
+
+    def done(self, ok):
+        self.ok = ok
+
+    def timed_out(self):
+        self.inconclusive = True
+
+
+class CircuitBreaker:
+    def __init__(self, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS, error_rate=BREAKER_ERROR_RATE,
+                 slow_seconds=BREAKER_SLOW_SECONDS, slow_rate=BREAKER_SLOW_RATE, cooldown=BREAKER_COOLDOWN,
+                 probes=BREAKER_PROBES):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self.probes = probes
+        self.state = CLOSED
+        self.reason = ""                # 마지막으로 열린 이유 (배너 표시용)
+        self.opened_at = 0.0
+        self._calls = collections.deque()   # (시각, 실패 여부, 느림 여부)
+        self._probing = 0
+        self._generation = 0            # 반열림에 들어갈 때마다 증가 (이전 반열림의 시험 요청 구분)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def call(self):
+        """허용되지 않으면 CircuitOpenError. 블록 안에서 call.done(ok) 또는 call.timed_out() 으로 결과를 남긴다."""
+        call = Call(self._admit())
+        try:
+            yield call
+        finally:
+            self._finish(call, time.perf_counter() - call.start)
+
+    def _admit(self):
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self._reject()
+                    raise CircuitOpenError(f"백엔드 상태가 좋지 않아 잠시 요청을 보내지 않습니다 ({self.reason})")
+                self.state = HALF_OPEN
+                self._probing = 0
+                self._generation += 1
+            if self.state == HALF_OPEN:
+                if self._probing >= self.probes:
+                    self._reject()
+                    raise CircuitOpenError(f"백엔드 회복 여부를 확인하는 중입니다 ({self.reason})")
+                self._probing += 1
+                return self._generation
+            return None
+
+    def _reject(self):
+        # 열려 있어서 보내지 않은 요청 수 (state: open / half_open)
+        metrics.get_metrics().inc("app_breaker_rejected_total", state=self.state)
+
+    def _finish(self, call, seconds):
+        now = time.monotonic()
+        slow = seconds >= self.slow_seconds
+        failed = not call.inconclusive and not call.ok
+        with self._lock:
+            if call.probe is not None:
+                # 시험 요청만 반열림 상태를 바꾼다. 그 사이 상태가 바뀌었으면(다른 세대) 결과를 버린다
+                if self.state != HALF_OPEN or call.probe != self._generation:
+                    return
+                self._probing = max(0, self._probing - 1)
+                if failed or slow:
+                    self._open(now, "시험 요청 실패" if failed else f"시험 요청 {seconds:.1f}초")
+                elif not call.inconclusive:
+                    self.state = CLOSED
+                    self._calls.clear()
+                return
+            if self.state != CLOSED:
+                return          # 열리기 전에 보낸 요청의 늦은 결과는 상태를 바꾸지 않는다
+            self._calls.append((now, failed, slow))
+            while self._calls and now - self._calls[0][0] > self.window:
+                self._calls.popleft()
+            if len(self._calls) < self.min_calls:
+                return
+            n = len(self._calls)
+            errors = sum(c[1] for c in self._calls) / n
+            slows = sum(c[2] for c in self._calls) / n
+            if errors >= self.error_rate:
+                self._open(now, f"최근 {n}건 중 오류 {errors:.0%}")
+            elif slows >= self.slow_rate:
+                self._open(now, f"최근 {n}건 중 {self.slow_seconds:.0f}초 이상 지연 {slows:.0%}")
+
+    def _open(self, now, reason):
+        self.state = OPEN
+        self.opened_at = now
+        self.reason = reason
+
+    @property
+    def is_open(self):
+        # cooldown 중인 열린 상태 (반열림은 시험 요청을 보내야 하므로 False)
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self.opened_at < self.cooldown
+
+    def capacity(self):
+        """지금 보낼 수 있는 요청 수. 닫혀 있으면 None(제한 없음), 열려 있으면 0, 반열림이면 남은 시험 요청 수"""
+        with self._lock:
+            if self.state == CLOSED:
+                return None
+            if self.state == OPEN:
+                return 0 if time.monotonic() - self.opened_at < self.cooldown else self.probes
+            return max(0, self.probes - self._probing)
+
+    def retry_in(self):
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+
+@st.cache_resource(show_spinner=False)
+def get_breaker():
+    return CircuitBreaker()
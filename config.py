@@ -2,3 +2,80 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 BACK_URL = os.getenv('BACK_URL')
+
+# --- 백엔드 HTTP 클라이언트 설정 ---
+BACK_POOL_SIZE = int(os.getenv('BACK_POOL_SIZE', '20'))      # 호스트당 유지할 keep-alive 연결 수
+BACK_RETRIES = int(os.getenv('BACK_RETRIES', '2'))           # 연결 실패 재시도 횟수 (502/503/504 는 Idempotency-Key 가 있는 요청만)
+BACK_HTTP2 = os.getenv('BACK_HTTP2', '0') == '1'             # HTTP/2 사용 (https + h2 패키지 필요)
+
+# --- 업로드 전처리 설정 ---
+UPLOAD_MAX_SIDE = int(os.getenv('UPLOAD_MAX_SIDE', '1600'))  # 긴 변 최대 픽셀
+UPLOAD_FORMAT = os.getenv('UPLOAD_FORMAT', 'JPEG')           # JPEG 또는 WEBP
+UPLOAD_QUALITY = int(os.getenv('UPLOAD_QUALITY', '85'))
+
+# --- 식별 결과 캐시 설정 ---
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '600'))    # 초
+RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '256'))  # 최대 항목 수 (LRU)
+
+# --- 실시간 스트리밍 전송 설정 ---
+BACK_STREAM = os.getenv('BACK_STREAM', '0') == '1'           # WebSocket 으로 프레임 전송 (실패 시 HTTP POST)
+BACK_WS_URL = os.getenv('BACK_WS_URL')                        # 미지정 시 BACK_URL 의 http→ws 변환
+
+# --- 일괄 등록 설정 ---
+BULK_WORKERS = int(os.getenv('BULK_WORKERS', '8'))                 # 동시 업로드 수
+BULK_MANIFEST_DIR = os.getenv('BULK_MANIFEST_DIR', '.bulk_manifests')  # 재개용 진행 기록 위치
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))               # 여러 장 식별 시 동시 요청 수
+
+# --- 출석 조회 캐시 설정 ---
+ATTEND_CACHE_SIZE = int(os.getenv('ATTEND_CACHE_SIZE', '5000'))       # (학생, 월, 시간대) 항목 수
+ATTEND_PAST_TTL = int(os.getenv('ATTEND_PAST_TTL', '86400'))          # 지난 달 캐시 유지 시간(초)
+ATTEND_CURRENT_TTL = int(os.getenv('ATTEND_CURRENT_TTL', '60'))       # 이번 달 캐시 유지 시간(초)
+ROSTER_WORKERS = int(os.getenv('ROSTER_WORKERS', '8'))                # 반 전체 조회 시 동시 요청 수
+
+# --- 개발 모드: 페이지 폴더 변경을 감지해 메뉴를 다시 만든다 ---
+DEV_MODE = os.getenv('DEV_MODE', '0') == '1'
+
+# --- 성능 지표 ---
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))               # >0 이면 http://:PORT/metrics 로 Prometheus 지표 노출
+METRICS_CSV = os.getenv('METRICS_CSV')                           # 지정 시 단계별 측정값을 CSV 로 기록
+METRICS_CSV_MAX_BYTES = int(os.getenv('METRICS_CSV_MAX_BYTES', str(10 * 2**20)))  # 넘으면 .1 로 교체
+METRICS_OVERLAY = os.getenv('METRICS_OVERLAY', '0') == '1'       # 실시간 영상에 FPS/지연 표시
+
+# --- 전송 대기열 (write-behind) ---
+BACK_OUTBOX = os.getenv('BACK_OUTBOX', '0') == '1'               # 등록/식별 요청을 로컬 대기열에 먼저 기록하고 백그라운드 전송
+OUTBOX_PATH = os.getenv('OUTBOX_PATH', '.outbox.sqlite3')        # 대기열 SQLite 파일
+OUTBOX_LIVE_INTERVAL = float(os.getenv('OUTBOX_LIVE_INTERVAL', '5'))  # 실시간 페이지: 백엔드가 죽었을 때 세션당 이 간격(초)마다 한 장 접수
+OUTBOX_BATCH = int(os.getenv('OUTBOX_BATCH', '8'))               # 한 번에 동시에 보내는 항목 수
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '8')) # 넘으면 실패로 표시 (관리 페이지에서 재시도)
+OUTBOX_INTERVAL = float(os.getenv('OUTBOX_INTERVAL', '1.0'))     # 보낼 항목이 없을 때 확인 주기(초)
+
+# --- 실시간 영상 프레임 처리 ---
+FRAME_BUDGET_MS = float(os.getenv('FRAME_BUDGET_MS', '33'))    # recv 한 번에 쓸 수 있는 시간 (넘으면 오버레이 축소)
+SEND_MAX_SIDE = int(os.getenv('SEND_MAX_SIDE', '960'))         # 전송 프레임 긴 변 최대 픽셀
+SEND_TARGET_RTT = float(os.getenv('SEND_TARGET_RTT', '0.5'))   # 이보다 느리면 전송 해상도/품질을 낮춘다(초)
+SEND_ADAPTIVE = os.getenv('SEND_ADAPTIVE', '1') == '1'         # RTT/인식 점수에 따라 전송 해상도·품질 자동 조절
+CAPTURE_WIDTH = int(os.getenv('CAPTURE_WIDTH', '1280'))        # 카메라에 요청할 캡처 폭 (ideal)
+
+# --- 여러 카메라 세션 프레임 묶음 전송 ---
+BACK_FRAME_BATCH = os.getenv('BACK_FRAME_BATCH', '0') == '1'              # 모든 세션의 프레임을 모아 /predict_batch 로 전송
+FRAME_BATCH_WINDOW_MS = float(os.getenv('FRAME_BATCH_WINDOW_MS', '20'))  # 첫 프레임 이후 더 기다리는 시간
+FRAME_BATCH_MAX = int(os.getenv('FRAME_BATCH_MAX', '16'))                # 한 묶음 최대 프레임 수
+FRAME_BATCH_SENDERS = int(os.getenv('FRAME_BATCH_SENDERS', '4'))         # 동시에 보내는 묶음 수
+
+# --- 출석 확인 중복 방지 ---
+KIOSK_ID = os.getenv('KIOSK_ID', 'default')                        # 페이지 주소의 ?kiosk= 로 세션별 지정 가능
+CHECKIN_TTL = int(os.getenv('CHECKIN_TTL', '600'))                 # 이 시간(초) 안에 다시 인식되면 백엔드에 묻지 않음
+CHECKIN_CACHE_SIZE = int(os.getenv('CHECKIN_CACHE_SIZE', '10000'))
+
+# --- 요청 마감 시간 / 서킷 브레이커 ---
+LIVE_DEADLINE = float(os.getenv('LIVE_DEADLINE', '2.0'))           # 실시간 프레임: 다음 전송 전에 답이 와야 의미가 있음(초)
+PHOTO_DEADLINE = float(os.getenv('PHOTO_DEADLINE', '15'))          # 사진 등록/확인 화면에서 사용자가 기다리는 한도(초)
+ATTEND_DEADLINE = float(os.getenv('ATTEND_DEADLINE', '30'))        # 출석 조회 (여러 페이지 요청 전체)
+BACKGROUND_DEADLINE = float(os.getenv('BACKGROUND_DEADLINE', '60'))  # 대기열/일괄 작업
+BREAKER_WINDOW = float(os.getenv('BREAKER_WINDOW', '30'))          # 최근 이 시간(초)의 호출로 판단
+BREAKER_MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '10'))      # 이보다 적으면 판단하지 않음
+BREAKER_ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', '0.5')) # 오류(5xx/연결/시간 초과) 비율
+BREAKER_SLOW_SECONDS = float(os.getenv('BREAKER_SLOW_SECONDS', '5'))
+BREAKER_SLOW_RATE = float(os.getenv('BREAKER_SLOW_RATE', '0.5'))   # BREAKER_SLOW_SECONDS 이상 걸린 비율
+BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '15'))      # 열린 뒤 시험 요청까지 기다리는 시간(초)
+BREAKER_PROBES = int(os.getenv('BREAKER_PROBES', '1'))             # 반열림 상태에서 동시에 보낼 시험 요청 수
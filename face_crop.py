@@ -0,0 +1,107 @@
+import math
+import threading
+
+import cv2
+import numpy as np
+
+# opencv-python-headless 에 포함된 Haar cascade 사용 (별도 모델 파일 불필요)
+_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+_local = threading.local()
+
+
+def _cascade():
+    # CascadeClassifier 는 스레드 간 공유하지 않고 스레드마다 하나씩 둔다
+    if not hasattr(_local, "cascade"):
+        _local.cascade = cv2.CascadeClassifier(_CASCADE_PATH)
+    return _local.cascade
+
+
+def detect_faces(img, is_rgb=False, detect_width=480, min_size_ratio=0.04):
+    """
+    축소한 영상에서 얼굴을 검출하고 원본 좌표 [xmin, ymin, xmax, ymax] 목록으로 돌려준다.
+    (백엔드 응답의 points 와 같은 형식)
+    """
+    h, w = img.shape[:2]
+    scale = min(1.0, detect_width / w)
+    small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else img
+    gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY if is_rgb else cv2.COLOR_BGR2GRAY)
+    gray = cv2.equalizeHist(gray)
+
+    min_side = max(20, int(min(gray.shape) * min_size_ratio))
+    found = _cascade().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+    return [
+        [int(x / scale), int(y / scale), int((x + bw) / scale), int((y + bh) / scale)]
+        for x, y, bw, bh in found
+    ]
+
+
+def pad_box(box, shape, pad=0.4):
+    # 얼굴 주변 여백을 pad 비율만큼 추가 (백엔드 검출기가 얼굴 윤곽을 찾을 수 있도록)
+    h, w = shape[:2]
+    xmin, ymin, xmax, ymax = box
+    dx, dy = int((xmax - xmin) * pad), int((ymax - ymin) * pad)
+    return [max(0, xmin - dx), max(0, ymin - dy), min(w, xmax + dx), min(h, ymax + dy)]
+
+
+def largest_face_crop(img, boxes, pad=0.4):
+    xmin, ymin, xmax, ymax = pad_box(max(boxes, key=lambda b: (b[2] - b[0]) * (b[3] - b[1])), img.shape, pad)
+    return img[ymin:ymax, xmin:xmax]
+
+
+def build_mosaic(img, boxes, pad=0.4, tile=224, gap=16):
+    """
+    얼굴 crop 들을 tile 크기 격자로 모아 한 장으로 만든다.
+    tiles 에는 (격자 위치, 원본 crop 위치, 배율)을 기록해 두어 map_points_back 으로 원래 좌표를 복원한다.
+    """
+    cols = math.ceil(math.sqrt(len(boxes)))
+    rows = math.ceil(len(boxes) / cols)
+    mosaic = np.zeros((rows * (tile + gap) + gap, cols * (tile + gap) + gap, img.shape[2]), dtype=img.dtype)
+
+    tiles = []
+    for i, box in enumerate(boxes):
+        xmin, ymin, xmax, ymax = pad_box(box, img.shape, pad)
+        crop = img[ymin:ymax, xmin:xmax]
+        scale = tile / max(crop.shape[:2])
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+
+        tx = gap + (i % cols) * (tile + gap)
+        ty = gap + (i // cols) * (tile + gap)
+        ch, cw = crop.shape[:2]
+        mosaic[ty:ty + ch, tx:tx + cw] = crop
+        tiles.append({"tile": (tx, ty, tx + cw, ty + ch), "origin": (xmin, ymin), "scale": scale})
+    return mosaic, tiles
+
+
+def map_points_back(points, tiles):
+    # 모자이크 좌표 → 원본 좌표. 어느 타일에도 속하지 않으면 None
+    xmin, ymin, xmax, ymax = points
+    cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+    for t in tiles:
+        tx0, ty0, tx1, ty1 = t["tile"]
+        if tx0 <= cx < tx1 and ty0 <= cy < ty1:
+            ox, oy = t["origin"]
+            s = t["scale"]
+            return [
+                int(ox + (min(max(xmin, tx0), tx1) - tx0) / s),
+                int(oy + (min(max(ymin, ty0), ty1) - ty0) / s),
+                int(ox + (min(max(xmax, tx0), tx1) - tx0) / s),
+                int(oy + (min(max(ymax, ty0), ty1) - ty0) / s),
+            ]
+    return None
+
+
+def remap_detail(data, tiles):
+    # /predict_many 응답의 detail[*].points 를 원본 이미지 좌표로 되돌린다
+    detail = []
+    for dic in data.get("detail") or []:
+        points = map_points_back(dic.get("points"), tiles)
+        if points is not None:
+            detail.append({**dic, "points": points})
+    return {**data, "detail": detail}
+
+
+def encode_jpeg(img, is_rgb=False, quality=90):
+    if is_rgb:
+        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+    _, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buf.tobytes()
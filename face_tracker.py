@@ -0,0 +1,157 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import face_crop
+
+KNOWN_COLOR = (0, 255, 0)       # BGR
+UNKNOWN_COLOR = (0, 0, 255)
+PENDING_COLOR = (0, 255, 255)
+
+
+def iou_matrix(a, b):
+    # a: (N, 4), b: (M, 4) [xmin, ymin, xmax, ymax] → (N, M) IoU
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    a, b = a[:, None, :], b[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def greedy_match(iou, threshold):
+    # IoU 가 큰 쌍부터 1:1 로 짝짓기
+    pairs = []
+    iou = iou.copy()
+    while iou.size:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        if iou[i, j] < threshold:
+            break
+        pairs.append((i, j))
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return pairs
+
+
+class Track:
+    def __init__(self, box):
+        self.box = np.asarray(box, dtype=np.float32)
+        self.name = None            # 아직 백엔드 결과가 없으면 None
+        self.student_id = None
+        self.score = None
+        self.queried = False        # 이 얼굴이 들어간 프레임을 보낸 적이 있는지
+        self.misses = 0
+
+
+class FaceTracker:
+    """
+    백엔드 호출 사이에 로컬 얼굴 검출(축소 영상) + IoU 매칭으로 얼굴 위치를 따라가며 이름을 유지한다.
+
+    새 얼굴이 나타나거나 추적이 끊겼을 때만 백엔드에 다시 묻고(min_interval 이상 간격),
+    그 외에는 max_interval 마다 한 번씩만 라벨을 갱신한다. 프레임 샘플링 정책과 같은 should_send 를 제공한다.
+    is_settled(student_id) 가 모든 트랙에 대해 참이면 (예: 이미 출석 확인됨) 주기적 갱신도 생략한다.
+    """
+
+    def __init__(self, detect_every=3, detect_width=320, iou_threshold=0.3, max_misses=5,
+                 min_interval=0.5, max_interval=10.0, smoothing=0.5, is_settled=None):
+        self.detect_every = detect_every
+        self.detect_width = detect_width
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.is_settled = is_settled
+        self.tracks = []
+        self._frame = 0
+        self._lost = False
+        self._last_query = float("-inf")
+        self._lock = threading.Lock()
+
+    def update(self, img):
+        self._frame += 1
+        if self._frame % self.detect_every:
+            return
+        found = face_crop.detect_faces(img, detect_width=self.detect_width)
+        boxes = np.asarray(found, dtype=np.float32).reshape(-1, 4)
+
+        with self._lock:
+            current = np.array([t.box for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+            pairs = greedy_match(iou_matrix(current, boxes), self.iou_threshold)
+            matched_t = {i for i, _ in pairs}
+            matched_d = {j for _, j in pairs}
+            for i, j in pairs:
+                t = self.tracks[i]
+                t.box = self.smoothing * t.box + (1 - self.smoothing) * boxes[j]
+                t.misses = 0
+            for i, t in enumerate(self.tracks):
+                if i not in matched_t:
+                    t.misses += 1
+            alive = [t for t in self.tracks if t.misses <= self.max_misses]
+            if len(alive) < len(self.tracks):
+                self._lost = True
+            self.tracks = alive + [Track(boxes[j]) for j in range(len(boxes)) if j not in matched_d]
+
+    def should_send(self, img, now=None):
+        self.update(img)
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.tracks:
+                self._lost = False          # 아무도 없으면 물어볼 필요 없음
+                return False
+            elapsed = now - self._last_query
+            if elapsed < self.min_interval:
+                return False
+            changed = self._lost or any(not t.queried for t in self.tracks)
+            if not changed and elapsed < self.max_interval:
+                return False
+            if not changed and self.is_settled is not None and all(
+                    t.student_id is not None and self.is_settled(t.student_id) for t in self.tracks):
+                self._last_query = now      # 다음 확인은 다시 max_interval 뒤에
+                return False
+            self._lost = False
+            self._last_query = now
+            for t in self.tracks:
+                t.queried = True
+            return True
+
+    def boxes(self):
+        with self._lock:
+            return [[int(v) for v in t.box] for t in self.tracks]
+
+    def apply_result(self, detail):
+        # 백엔드가 돌려준 (원본 좌표) 박스를 현재 트랙에 붙인다. 짝이 없는 박스는 새 트랙으로 추가
+        boxes = np.asarray([d.get("points") for d in detail], dtype=np.float32).reshape(-1, 4)
+        with self._lock:
+            current = np.array([t.box for t in self.tracks], dtype=np.float32).reshape(-1, 4)
+            pairs = greedy_match(iou_matrix(current, boxes), self.iou_threshold)
+            matched_d = set()
+            for i, j in pairs:
+                self.tracks[i].name = detail[j].get("student_name")
+                self.tracks[i].student_id = detail[j].get("student_id")
+                self.tracks[i].score = detail[j].get("score")
+                matched_d.add(j)
+            for j in range(len(boxes)):
+                if j not in matched_d:
+                    t = Track(boxes[j])
+                    t.name, t.score, t.queried = detail[j].get("student_name"), detail[j].get("score"), True
+                    t.student_id = detail[j].get("student_id")
+                    self.tracks.append(t)
+
+    def draw(self, img, labels=True):
+        with self._lock:
+            snapshot = [(t.box.astype(int), t.name, t.score) for t in self.tracks]
+        for (xmin, ymin, xmax, ymax), name, score in snapshot:
+            if name is None:
+                color, text = PENDING_COLOR, "..."
+            else:
+                color = UNKNOWN_COLOR if name == "unknown" else KNOWN_COLOR
+                text = f"{name} {score or 0:.2f}"
+            cv2.rectangle(img, (xmin, ymin), (xmax, ymax), color, 2)
+            if labels:
+                cv2.putText(img, text, (xmin, max(15, ymin - 6)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
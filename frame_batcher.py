@@ -0,0 +1,148 @@
+"""
+여러 실시간 카메라 세션의 프레임을 모아 한 번에 보내는 프로세스 공용 배처.
+
+교실 키오스크 여러 대가 같은 Streamlit 서버에 붙어 있을 때, 세션마다 한 장씩 요청하면
+백엔드 GPU 가 작은 요청을 따라가지 못한다. 첫 프레임이 들어온 뒤 window 초 동안(최대 max_batch 장)
+들어온 프레임을 엔드포인트별로 묶어 /predict_batch 로 한 번에 보내고, 결과를 각 세션에 돌려준다.
+
+/predict_batch 요청: form 의 endpoint(/predict 또는 /predict_many) + 순서대로 여러 개의 file 파트
+/predict_batch 응답: {"results": [{"status": 200, "result": {...}}, ...]} (file 순서와 같음)
+백엔드에 /predict_batch 가 없으면(404/405) retry_after 초 동안은 한 장씩 원래 엔드포인트로 보낸다.
+"""
+import collections
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import streamlit as st
+
+import api_client
+import metrics
+from config import FRAME_BATCH_WINDOW_MS, FRAME_BATCH_MAX, FRAME_BATCH_SENDERS
+
+log = logging.getLogger(__name__)
+
+BATCH_PATH = "/predict_batch"
+
+
+def _parse(response):
+    if not response.content:
+        return response.status_code, None
+    try:
+        return response.status_code, response.json()
+    except ValueError:
+        return response.status_code, response.text
+
+
+class FrameBatcher:
+    def __init__(self, window=FRAME_BATCH_WINDOW_MS / 1000.0, max_batch=FRAME_BATCH_MAX,
+                 senders=FRAME_BATCH_SENDERS, retry_after=30.0):
+        self.window = window
+        self.max_batch = max_batch
+        self.retry_after = retry_after
+        self._queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=senders, thread_name_prefix="frame-batch")
+        self._unsupported_until = 0.0
+        self._thread = threading.Thread(target=self._collect, name="frame-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, endpoint, jpeg, deadline=None):
+        """
+        Future[(status_code, result)] 를 돌려준다.
+        deadline(time.monotonic 기준)은 제출한 시점에 정해지며, 큐에서 기다린 시간도 여기에 포함된다.
+        """
+        future = Future()
+        self._queue.put((endpoint, jpeg, future, deadline or api_client.deadline("live")))
+        return future
+
+    def predict(self, endpoint, jpeg, timeout):
+        return self.submit(endpoint, jpeg, time.monotonic() + timeout).result(timeout=timeout)
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        self._pool.shutdown(wait=False)
+
+    def _collect(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            groups = collections.defaultdict(list)
+            for endpoint, jpeg, future, deadline in batch:
+                groups[endpoint].append((jpeg, future, deadline))
+            for endpoint, items in groups.items():
+                self._pool.submit(self._send, endpoint, items)
+
+    def _send(self, endpoint, items):
+        # 큐에서 기다리다 이미 마감이 지난 프레임은 보내지 않는다
+        now = time.monotonic()
+        for _, future, deadline in items:
+            if deadline <= now:
+                future.set_exception(api_client.DeadlineExceeded(f"{endpoint}: 전송 전에 마감 시간이 지났습니다"))
+        items = [item for item in items if item[2] > now]
+        if not items:
+            return
+        registry = metrics.get_metrics()
+        registry.inc("app_frame_batches_total", endpoint=endpoint)
+        registry.inc("app_frame_batch_frames_total", value=len(items), endpoint=endpoint)
+        try:
+            if len(items) == 1 or time.monotonic() < self._unsupported_until:
+                for item in items:
+                    self._send_one(endpoint, *item)
+                return
+            files = [("file", (f"frame{i}.jpg", jpeg, "image/jpeg")) for i, (jpeg, _, _) in enumerate(items)]
+            # 묶음은 가장 급한 프레임의 마감에 맞춘다
+            response = api_client.post(BATCH_PATH, data={"endpoint": endpoint}, files=files,
+                                       deadline=min(item[2] for item in items))
+            if response.status_code in (404, 405):
+                log.warning("백엔드에 /predict_batch 가 없어 한 장씩 전송합니다.")
+                self._unsupported_until = time.monotonic() + self.retry_after
+                for item in items:
+                    self._send_one(endpoint, *item)
+                return
+            status, body = _parse(response)
+            results = body.get("results") if status == 200 and isinstance(body, dict) else None
+            if results is None or len(results) != len(items):
+                # 묶음 전체가 실패하면 모든 세션에 같은 상태를 돌려준다
+                for _, future, _ in items:
+                    future.set_result((status, body))
+                return
+            for (_, future, _), r in zip(items, results):
+                future.set_result((r.get("status", 200), r.get("result")))
+        except Exception as e:
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _send_one(self, endpoint, jpeg, future, deadline):
+        if future.done():
+            return
+        try:
+            response = api_client.post(endpoint, files={"file": ("frame.jpg", jpeg, "image/jpeg")}, deadline=deadline)
+        except Exception as e:
+            future.set_exception(e)     # 한 장의 실패가 같은 묶음의 다른 프레임에 번지지 않게
+            return
+        future.set_result(_parse(response))
+
+
+@st.cache_resource(show_spinner=False)
+def get_frame_batcher():
+    return FrameBatcher()
@@ -0,0 +1,165 @@
+import threading
+
+import cv2
+import numpy as np
+
+import metrics
+from config import FRAME_BUDGET_MS, SEND_MAX_SIDE, SEND_TARGET_RTT, SEND_ADAPTIVE
+
+
+class FrameBudget:
+    """
+    recv 한 번에 쓴 시간을 프레임 예산과 비교해 오버레이를 얼마나 줄일지(level) 정한다.
+
+    - FULL: 모든 오버레이 / REDUCED: 글자 없이 박스만 / MINIMAL: 결과 라벨만
+    - 지수이동평균이 예산을 넘으면 한 단계 줄이고, recover 비율 아래로 내려가면 한 단계 되돌린다
+    - 단계가 오르내리며 깜빡이지 않도록 hold 프레임 동안은 단계를 유지한다
+    """
+
+    FULL, REDUCED, MINIMAL = 0, 1, 2
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, alpha=0.2, recover=0.6, hold=15):
+        self.budget = budget_ms / 1000.0
+        self.alpha = alpha
+        self.recover = recover
+        self.hold = hold
+        self.level = self.FULL
+        self.average = 0.0
+        self.overruns = 0               # 예산을 넘긴 프레임 수
+        self._since_change = 0
+
+    def record(self, seconds):
+        self.average = seconds if self.average == 0.0 else self.alpha * seconds + (1 - self.alpha) * self.average
+        if seconds > self.budget:
+            self.overruns += 1
+        self._since_change += 1
+        if self._since_change < self.hold:
+            return self.level
+        if self.average > self.budget and self.level < self.MINIMAL:
+            self.level += 1
+            self._since_change = 0
+        elif self.average < self.budget * self.recover and self.level > self.FULL:
+            self.level -= 1
+            self._since_change = 0
+        return self.level
+
+
+class SendBuffers:
+    """
+    전송할 프레임을 담는 버퍼 풀.
+
+    recv 에서 매번 img.copy() 로 새 배열을 만들지 않고, 미리 만든 버퍼에 (필요하면 축소하며) 한 번만 복사한다.
+    워커가 다 쓴 버퍼는 release 로 돌려받고, 모든 버퍼가 사용 중이면 이번 프레임은 보내지 않는다.
+    """
+
+    def __init__(self, max_side=SEND_MAX_SIDE, count=3):
+        self.max_side = max_side
+        self.count = count
+        self._free = []
+        self._shape = None
+        self._lock = threading.Lock()
+
+    def _target_shape(self, img):
+        h, w = img.shape[:2]
+        scale = min(1.0, self.max_side / max(h, w))
+        return (round(h * scale), round(w * scale)) + img.shape[2:], scale
+
+    def fill(self, img):
+        """반환: (버퍼, 축소 비율) 또는 빈 버퍼가 없으면 (None, 1.0)"""
+        shape, scale = self._target_shape(img)
+        with self._lock:
+            if shape != self._shape:
+                # 해상도가 바뀌면 풀을 새로 만든다 (사용 중인 이전 버퍼는 release 때 버려짐)
+                self._shape = shape
+                self._free = [np.empty(shape, dtype=img.dtype) for _ in range(self.count)]
+            if not self._free:
+                # 빈 버퍼가 없어 이번 프레임은 보내지 못함
+                metrics.get_metrics().inc("app_send_buffer_skipped_total")
+                return None, 1.0
+            buf = self._free.pop()
+        if scale < 1.0:
+            cv2.resize(img, (shape[1], shape[0]), dst=buf, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(buf, img)
+        return buf, scale
+
+    def release(self, buf):
+        with self._lock:
+            if buf.shape == self._shape and len(self._free) < self.count:
+                self._free.append(buf)
+
+
+def scale_boxes(boxes, scale):
+    return [[int(v * scale) for v in box] for box in boxes]
+
+
+def unscale_detail(detail, scale):
+    # 축소 프레임 기준 points 를 원본 프레임 좌표로 (새 리스트, 원본은 그대로)
+    if scale == 1.0:
+        return detail
+    return [{**d, "points": [v / scale for v in d["points"]]} if d.get("points") else d for d in detail]
+
+
+# (긴 변 최대 픽셀, JPEG 품질) — 아래로 갈수록 대역폭을 더 쓴다
+SEND_LADDER = ((480, 60), (640, 70), (800, 80), (960, 85), (1280, 90))
+CAPTURE_WIDTHS = (640, 960, 1280, 1920)
+
+
+class SendQualityController:
+    """
+    백엔드 왕복 시간(RTT)과 인식 점수로 전송 해상도/JPEG 품질 단계를 고른다.
+
+    - RTT 평균이 target_rtt 를 넘으면 한 단계 낮춘다 (대역폭/서버가 못 따라옴)
+    - RTT 에 여유가 있는데 점수가 confidence 보다 낮으면 한 단계 올린다 (더 선명하면 인식이 나아질 수 있음)
+    - 점수가 충분하면 그대로 둔다. 단계를 바꾼 뒤 hold 번은 결과를 더 모은다
+    - adaptive=False 면 측정만 하고 SEND_MAX_SIDE 에 맞는 단계를 유지한다
+    """
+
+    def __init__(self, target_rtt=SEND_TARGET_RTT, confidence=0.6, ladder=SEND_LADDER, start=None, alpha=0.3,
+                 hold=3, adaptive=SEND_ADAPTIVE):
+        self.target_rtt = target_rtt
+        self.confidence = confidence
+        self.ladder = ladder
+        if start is None:
+            start = max([i for i, (side, _) in enumerate(ladder) if side <= SEND_MAX_SIDE] or [0])
+        self.step = start
+        self.adaptive = adaptive
+        self.alpha = alpha
+        self.hold = hold
+        self.rtt = None
+        self.score = None
+        self._since_change = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_side(self):
+        return self.ladder[self.step][0]
+
+    @property
+    def quality(self):
+        return self.ladder[self.step][1]
+
+    def encode_params(self):
+        return [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+
+    def capture_width(self):
+        # 지금 단계에서 쓸모 있는 최소 캡처 폭 (이보다 크게 받아도 전송 전에 줄인다)
+        return next((w for w in CAPTURE_WIDTHS if w >= self.max_side), CAPTURE_WIDTHS[-1])
+
+    def observe(self, rtt, score=None):
+        """전송 한 번의 결과를 반영한다. score 는 인식 점수(없으면 None)"""
+        with self._lock:
+            self.rtt = rtt if self.rtt is None else self.alpha * rtt + (1 - self.alpha) * self.rtt
+            if score is not None:
+                self.score = score if self.score is None else self.alpha * score + (1 - self.alpha) * self.score
+            self._since_change += 1
+            if not self.adaptive or self._since_change < self.hold:
+                return
+            if self.rtt > self.target_rtt and self.step > 0:
+                self.step -= 1
+            elif (self.rtt < self.target_rtt * 0.5 and self.score is not None and self.score < self.confidence
+                  and self.step < len(self.ladder) - 1):
+                self.step += 1
+            else:
+                return
+            self._since_change = 0
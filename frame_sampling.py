@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+
+# BGR → 그레이스케일 가중치
+_BGR_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+class EveryNFrames:
+    """기존 방식: 장면과 무관하게 n 프레임마다 전송"""
+
+    def __init__(self, n=100):
+        self.n = n
+        self.frame_count = 0
+
+    def should_send(self, img, now=None):
+        self.frame_count += 1
+        return self.frame_count % self.n == 0
+
+
+class MotionTrigger:
+    """
+    장면 변화가 있을 때만 전송하는 샘플링 정책.
+
+    축소한 그레이스케일 프레임을 마지막으로 전송한 프레임과 비교해,
+    픽셀 차이가 pixel_threshold 를 넘는 영역이 area_ratio 이상이면 전송한다.
+    전송 간격은 프레임 수가 아닌 실제 시간(초)으로 min_interval ~ max_interval 사이를 유지한다.
+    """
+
+    def __init__(self, min_interval=0.5, max_interval=5.0, pixel_threshold=25, area_ratio=0.02, step=8):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.pixel_threshold = pixel_threshold
+        self.area_ratio = area_ratio
+        self.step = step                    # 축소 비율 (가로/세로 step 픽셀마다 1개 샘플)
+        self.last_change = 0.0              # 마지막 판정 시 변화 비율 (디버그/오버레이용)
+        self._reference = None
+        self._last_sent = float("-inf")
+        # 프레임마다 새 배열을 만들지 않도록 재사용하는 버퍼 (해상도가 바뀌면 다시 만든다)
+        self._gray = None
+        self._diff = None
+        self._mask = None
+
+    def _thumbnail(self, img):
+        small = img[::self.step, ::self.step]           # 복사 없는 뷰
+        if self._gray is None or self._gray.shape != small.shape[:2]:
+            self._gray = np.empty(small.shape[:2], dtype=np.float32)
+            self._diff = np.empty_like(self._gray)
+            self._mask = np.empty(self._gray.shape, dtype=bool)
+            self._reference = None
+        return np.matmul(small, _BGR_WEIGHTS, out=self._gray)
+
+    def should_send(self, img, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_sent
+        if elapsed < self.min_interval:
+            return False
+
+        gray = self._thumbnail(img)
+        if self._reference is None or elapsed >= self.max_interval:
+            send = True
+        else:
+            np.subtract(gray, self._reference, out=self._diff)
+            np.abs(self._diff, out=self._diff)
+            np.greater(self._diff, self.pixel_threshold, out=self._mask)
+            self.last_change = np.count_nonzero(self._mask) / self._mask.size
+            send = self.last_change >= self.area_ratio
+
+        if send:
+            # 기준 프레임과 다음 프레임용 버퍼를 맞바꾼다
+            self._reference, self._gray = gray, (self._reference if self._reference is not None else np.empty_like(gray))
+            self._last_sent = now
+        return send
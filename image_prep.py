@@ -0,0 +1,65 @@
+import io
+
+from PIL import Image, ImageOps
+
+import metrics
+from config import UPLOAD_MAX_SIDE, UPLOAD_FORMAT, UPLOAD_QUALITY
+
+_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+_EXT = {"JPEG": "jpg", "WEBP": "webp"}
+# 90/270도 회전이 들어간 EXIF Orientation 값 (가로/세로가 바뀜)
+_TRANSPOSED = {5, 6, 7, 8}
+
+
+class PreparedImage:
+    """
+    업로드용으로 전처리한 이미지.
+    scale 은 (전송 이미지 크기 / 원본 크기) 이다. 결과는 전송한 image 위에 그리므로 points 를 변환하지 않는다.
+    """
+
+    def __init__(self, data, mime, filename, image, original_size, scale):
+        self.data = data                    # 인코딩된 바이트
+        self.mime = mime
+        self.filename = filename
+        self.image = image                  # 전송한 그대로의 PIL RGB 이미지
+        self.original_size = original_size  # EXIF 회전 적용 후 원본 (w, h)
+        self.scale = scale
+
+    def file_part(self):
+        return (self.filename, self.data, self.mime)
+
+
+def prepare_upload(file, max_side=UPLOAD_MAX_SIDE, fmt=UPLOAD_FORMAT, quality=UPLOAD_QUALITY):
+    """
+    EXIF 회전 적용 → 긴 변을 max_side 이하로 축소 → JPEG/WebP 재인코딩.
+    업로드 파일 객체를 바로 열어서 getvalue() 복사를 하지 않는다.
+    """
+    fmt = fmt.upper()
+    with metrics.timer("decode"):
+        file.seek(0)
+        img = Image.open(file)
+        w, h = img.size
+        if img.getexif().get(0x0112, 1) in _TRANSPOSED:
+            w, h = h, w
+        original_size = (w, h)
+
+        scale = min(1.0, max_side / max(w, h))
+        target = (max(1, round(w * scale)), max(1, round(h * scale)))
+        if scale < 1.0:
+            # JPEG 는 디코딩 단계에서 1/2, 1/4, 1/8 로 줄여 읽는다 (전체 해상도 디코딩 생략)
+            img.draft("RGB", (target[1], target[0]) if original_size != img.size else target)
+        img.load()
+    file.seek(0)                            # 이후 원본을 다시 열 수 있도록 위치 복원
+
+    with metrics.timer("preprocess"):
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if img.size != target:
+            img = img.resize(target, Image.Resampling.LANCZOS)
+
+    with metrics.timer("encode"):
+        buf = io.BytesIO()
+        img.save(buf, format=fmt, quality=quality)
+    filename = f"{getattr(file, 'name', 'image').rsplit('.', 1)[0]}.{_EXT.get(fmt, fmt.lower())}"
+    return PreparedImage(buf.getvalue(), _MIME.get(fmt, "application/octet-stream"), filename, img, original_size, scale)
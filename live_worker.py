@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+import metrics
+
+log = logging.getLogger(__name__)
+
+
+class InferenceWorker:
+    """
+    실시간 카메라 세션마다 하나씩 두는 백엔드 요청 워커.
+
+    - 대기 슬롯은 1칸: 아직 보내지 못한 프레임은 새 프레임으로 덮어쓴다 (latest frame wins)
+    - 동시에 나가는 요청 수는 max_in_flight(워커 스레드 수)를 넘지 않는다
+    - 프레임마다 시퀀스 번호를 붙여, 더 최신 결과가 이미 반영됐다면 늦게 온 결과는 버린다
+    - on_drop 을 주면 보내지 않고 버린 프레임을 돌려준다 (버퍼 풀 반납용)
+    - max_age 를 주면 제출 후 그 시간(초)이 지나 나온 결과는 화면에 반영하지 않는다
+    """
+
+    def __init__(self, handler, on_result, max_in_flight=1, name="inference", on_drop=None, max_age=None):
+        self.handler = handler          # img -> result (백엔드 호출)
+        self.on_result = on_result      # result -> None (화면 반영)
+        self.on_drop = on_drop          # img -> None
+        self.max_age = max_age
+        self.name = name                # 지표 라벨 (app_worker_frames_total{worker, outcome})
+
+        self._cond = threading.Condition()
+        self._pending = None            # (seq, img, 제출 시각 monotonic)
+        self._seq = 0
+        self._last_applied = 0
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max_in_flight)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, img):
+        with self._cond:
+            if self._stopped:
+                return False
+            if self._pending is not None:
+                self._count("dropped")     # 덮어써서 보내지 않은 프레임
+                self._drop(self._pending[1])
+            self._seq += 1
+            self._pending = (self._seq, img, time.monotonic())
+            self._cond.notify()
+        return True
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._stopped = True
+            if self._pending is not None:
+                self._drop(self._pending[1])
+            self._pending = None
+            self._cond.notify_all()
+        # 진행 중인 요청은 기다리지 않는다 (데몬 스레드, 결과는 버려짐)
+        for t in self._threads:
+            t.join(timeout=timeout / len(self._threads))
+
+    def _count(self, outcome):
+        metrics.get_metrics().inc("app_worker_frames_total", worker=self.name, outcome=outcome)
+
+    def _drop(self, img):
+        if self.on_drop is not None:
+            self.on_drop(img)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                seq, img, submitted = self._pending
+                self._pending = None
+
+            try:
+                result = self.handler(img)
+            except Exception as e:
+                log.warning("워커 예외 발생: %s", e)
+                continue
+
+            with self._cond:
+                if self._stopped or seq < self._last_applied:
+                    self._count("discarded")   # 더 최신 결과가 이미 반영됨
+                    continue
+                if self.max_age is not None and time.monotonic() - submitted > self.max_age:
+                    self._count("expired")     # max_age 를 넘김
+                    continue
+                self._last_applied = seq
+                self.on_result(result)
@@ -1,5 +1,7 @@
 import streamlit as st
-import glob,os
+import os
+import circuit_breaker
+import page_registry
 
 st.set_page_config(page_title="메인 페이지", page_icon="🏠")
 
@@ -30,21 +32,20 @@ else:
     st.success("You are in admin mode ✅")
 
 # --- 내비게이션 정의 ---
+# 페이지 목록은 page_registry 에서 한 번만 만들고 재사용
 pages = {}
-for i,path in enumerate(sorted(glob.glob('./pages/*'))): 
-    if not os.path.isdir(path):
-        continue
-    if i>1 and not st.session_state["is_admin"]:
-        continue
-    menu = path.replace('./pages/','')
-    pages[menu] = []
-    
-    for file_path in sorted(glob.glob(path+'/*')):
-        file = os.path.split(file_path)[1]
-        page = st.Page(file_path, title=file[:-3].replace('_',' '))
-        pages[menu].append(page)
+for group in page_registry.page_groups(st.session_state["is_admin"]):
+    pages[group["menu"]] = [
+        st.Page(file_path, title=page_registry.page_title(file_path)) for file_path in group["files"]
+    ]
 
 
+# --- 백엔드 장애 시 모든 페이지 위에 안내 ---
+breaker = circuit_breaker.get_breaker()
+if breaker.is_open:
+    st.warning(f"⚠️ 백엔드 응답이 원활하지 않아 잠시 요청을 보내지 않습니다 ({breaker.reason}). "
+               f"약 {breaker.retry_in():.0f}초 뒤 다시 시도합니다.")
+
 pg = st.navigation(pages)
 pg.run()
 
@@ -0,0 +1,201 @@
+"""
+단계별 시간 측정과 지표 내보내기.
+
+    metrics.set_page("predict_many")              # 페이지 상단에서 한 번
+    with metrics.timer("preprocess"):              # app_stage_seconds{page, stage}
+        ...
+
+지표는 METRICS_PORT 로 Prometheus 텍스트 형식(/metrics)으로 노출하거나, METRICS_CSV 파일에 한 줄씩 기록한다.
+"""
+import atexit
+import collections
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+from config import METRICS_PORT, METRICS_CSV, METRICS_CSV_MAX_BYTES
+
+log = logging.getLogger(__name__)
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_page = contextvars.ContextVar("metrics_page", default="")
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class CsvSink:
+    """
+    측정값을 메모리에 모았다가 interval 초마다 백그라운드 스레드가 CSV 에 한꺼번에 추가한다.
+    recv 같은 뜨거운 경로에서는 줄을 버퍼에 넣기만 한다 (파일 열기/쓰기 없음).
+    파일이 max_bytes 를 넘으면 .1 로 옮긴 뒤 새 파일에 쓴다. 버퍼는 max_pending 줄까지만 보관한다.
+    """
+
+    def __init__(self, path, max_bytes=METRICS_CSV_MAX_BYTES, interval=2.0, max_pending=100_000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._pending = collections.deque(maxlen=max_pending)
+        self._file_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="metrics-csv", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def write(self, name, labels, value):
+        # deque.append 는 스레드 안전하다
+        self._pending.append((time.time(), name, labels.get("page", ""),
+                              labels.get("stage", labels.get("endpoint", "")), value))
+
+    def flush(self):
+        lines = []
+        while self._pending:
+            try:
+                ts, name, page, stage, value = self._pending.popleft()
+            except IndexError:
+                break
+            lines.append(f"{ts:.3f},{name},{page},{stage},{value:.6f}\n")
+        if not lines:
+            return
+        with self._file_lock:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            new = not os.path.exists(self.path)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if new:
+                    f.write("ts,metric,page,stage,value\n")
+                f.writelines(lines)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except OSError as e:
+                log.warning("지표 CSV 기록 실패: %s", e)
+
+
+class Metrics:
+    def __init__(self, csv_path=METRICS_CSV):
+        self._lock = threading.Lock()
+        self._counters = {}             # (name, labels) -> float
+        self._histograms = {}           # (name, labels) -> Histogram
+        self._sink = CsvSink(csv_path) if csv_path else None
+
+    def inc(self, name, value=1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(seconds)
+        if self._sink is not None:
+            self._sink.write(name, labels, seconds)
+
+    def prometheus_text(self):
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self._counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{fmt(labels)} {value}")
+            for name in sorted({n for n, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), hist in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                    if n != name:
+                        continue
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {hist.count}")
+                    lines.append(f"{name}_sum{fmt(labels)} {hist.sum}")
+                    lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _serve(registry, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_metrics():
+    registry = Metrics()
+    if METRICS_PORT:
+        _serve(registry, METRICS_PORT)
+    return registry
+
+
+def set_page(page):
+    _page.set(page)
+
+
+def observe(stage, seconds, page=None):
+    get_metrics().observe("app_stage_seconds", seconds, page=page or _page.get(), stage=stage)
+
+
+@contextmanager
+def timer(stage, page=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, page)
+
+
+class RateMeter:
+    """호출 간격의 지수이동평균으로 초당 횟수(FPS)를 추정"""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.rate = 0.0
+        self._last = None
+
+    def tick(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self._last is not None and now > self._last:
+            inst = 1.0 / (now - self._last)
+            self.rate = inst if self.rate == 0.0 else self.alpha * inst + (1 - self.alpha) * self.rate
+        self._last = now
+        return self.rate
@@ -0,0 +1,300 @@
+"""
+백엔드 전송 대기열 (write-behind).
+
+등록/식별 요청을 먼저 로컬 SQLite 에 기록하고 바로 "접수" 응답을 돌려준 뒤,
+백그라운드 스레드가 묶음 단위로 백엔드에 전송한다. 백엔드가 느리거나 잠시 죽어 있어도
+키오스크는 계속 받을 수 있고, 실패한 항목은 지수 백오프로 다시 보낸다.
+
+각 항목은 내용으로 만든 Idempotency-Key 헤더와 함께 보내므로,
+응답을 받기 전에 끊겨서 다시 보내더라도 백엔드에서 한 번만 처리된다.
+"""
+import collections
+import datetime
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+
+import api_client
+import circuit_breaker
+import metrics
+import result_cache
+from config import OUTBOX_PATH, OUTBOX_BATCH, OUTBOX_MAX_ATTEMPTS, OUTBOX_INTERVAL, OUTBOX_LIVE_INTERVAL
+
+log = logging.getLogger(__name__)
+
+PENDING, SENDING, DONE, FAILED = "pending", "sending", "done", "failed"
+NOT_SENT = "not_sent"           # 브레이커/마감 때문에 보내지 못함 (시도 횟수에 넣지 않는다)
+STATUS_LABELS = {PENDING: "대기", SENDING: "전송 중", DONE: "완료", FAILED: "실패"}
+
+# 이 상태 코드는 나중에 다시 보내면 성공할 수 있다 (그 외 4xx 는 요청 자체가 잘못된 것)
+RETRY_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+MAX_BACKOFF = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    key         TEXT NOT NULL UNIQUE,
+    endpoint    TEXT NOT NULL,
+    data        TEXT,
+    filename    TEXT,
+    mime        TEXT,
+    content     BLOB,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    next_at     REAL NOT NULL,
+    http_status INTEGER,
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_at);
+"""
+
+# 목록 조회 시 이미지 본문(content)은 읽지 않는다
+_COLUMNS = "id, key, endpoint, data, filename, status, attempts, next_at, http_status, result, error, created_at, updated_at"
+
+
+def idempotency_key(endpoint, data=None, file_part=None, extra=None):
+    # 같은 (엔드포인트, 폼 값, 이미지, 추가 값) 이면 같은 키 → 중복 접수/중복 처리 방지
+    raw = result_cache.content_key(endpoint, file_part[1] if file_part else b"", extra={**(data or {}), **(extra or {})})
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def backoff(attempts):
+    return min(2 ** attempts, MAX_BACKOFF)
+
+
+def describe_depth(depth):
+    return " · ".join(f"{STATUS_LABELS[s]} {depth.get(s, 0)}건" for s in (PENDING, SENDING, FAILED))
+
+
+def describe_item(item):
+    if item["status"] == FAILED:
+        return f"{STATUS_LABELS[FAILED]} ({item['http_status'] or '연결 오류'}): {item['error']} — 관리자 전송 대기열 페이지에서 다시 보낼 수 있습니다"
+    if item["attempts"]:
+        return f"{STATUS_LABELS[item['status']]}, {item['attempts']}회 재시도"
+    return STATUS_LABELS[item["status"]]
+
+
+def _row_dict(row):
+    item = dict(zip(_COLUMNS.split(", "), row))
+    item["data"] = json.loads(item["data"]) if item["data"] else None
+    if item["result"]:
+        try:
+            item["result"] = json.loads(item["result"])
+        except ValueError:
+            pass
+    return item
+
+
+class Outbox:
+    """SQLite 로 영속화되는 전송 대기열. 한 연결을 lock 으로 보호해 세션/전송 스레드가 공유한다."""
+
+    def __init__(self, path=OUTBOX_PATH, batch=OUTBOX_BATCH, max_attempts=OUTBOX_MAX_ATTEMPTS,
+                 interval=OUTBOX_INTERVAL):
+        self.batch = batch
+        self.max_attempts = max_attempts
+        self.interval = interval
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=batch, thread_name_prefix="outbox-send")
+        self._thread = None
+        # 이전 프로세스가 전송 도중 종료됐다면 다시 대기 상태로 되돌린다
+        with self._lock:
+            self._db.execute("UPDATE outbox SET status = ? WHERE status = ?", (PENDING, SENDING))
+
+    # ---------------------------
+    # 접수 / 조회
+    # ---------------------------
+    def enqueue(self, endpoint, data=None, file_part=None, extra=None):
+        """요청을 기록하고 키를 돌려준다. 같은 키가 이미 있으면 새로 만들지 않는다."""
+        key = idempotency_key(endpoint, data, file_part, extra)
+        filename, content, mime = file_part if file_part else (None, None, None)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO outbox (key, endpoint, data, filename, mime, content, status, next_at,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(data, ensure_ascii=False) if data else None, filename, mime, content,
+                 PENDING, now, now, now),
+            )
+        self._wake.set()
+        return key
+
+    def status(self, key):
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM outbox WHERE key = ?", (key,)).fetchone()
+        return _row_dict(row) if row else None
+
+    def depth(self):
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return collections.Counter(dict(rows))
+
+    def items(self, statuses=None, limit=200):
+        query = f"SELECT {_COLUMNS} FROM outbox"
+        params = []
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            params += list(statuses)
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(query, params + [limit]).fetchall()
+        return [_row_dict(r) for r in rows]
+
+    def retry_failed(self):
+        with self._lock:
+            count = self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_at = ?, updated_at = ? WHERE status = ?",
+                (PENDING, time.time(), time.time(), FAILED),
+            ).rowcount
+        self._wake.set()
+        return count
+
+    def purge_done(self, older_than=0):
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM outbox WHERE status = ? AND updated_at <= ?", (DONE, time.time() - older_than),
+            ).rowcount
+
+    # ---------------------------
+    # 전송
+    # ---------------------------
+    def _claim(self, limit):
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, key, endpoint, data, filename, mime, content, attempts FROM outbox"
+                " WHERE status = ? AND next_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, now, limit),
+            ).fetchall()
+            if rows:
+                self._db.executemany(
+                    "UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?", [(SENDING, now, r[0]) for r in rows],
+                )
+        return rows
+
+    def _send(self, row):
+        """반환: (상태, HTTP 상태 코드, 응답 본문, 오류 메시지)"""
+        _, key, endpoint, data, filename, mime, content, _ = row
+        files = {"file": (filename, content, mime)} if content is not None else None
+        try:
+            resp = api_client.post(endpoint, data=json.loads(data) if data else None, files=files,
+                                   headers={"Idempotency-Key": key}, deadline=api_client.deadline("background"))
+        except (circuit_breaker.CircuitOpenError, api_client.DeadlineExceeded) as e:
+            return NOT_SENT, None, None, str(e)
+        except requests.exceptions.RequestException as e:
+            return None, None, None, str(e)
+        if resp.ok:
+            return DONE, resp.status_code, resp.text, None
+        if resp.status_code in RETRY_STATUS:
+            return None, resp.status_code, None, resp.text[:500]
+        return FAILED, resp.status_code, None, resp.text[:500]
+
+    def flush_once(self):
+        """전송할 차례인 항목을 최대 batch 개 동시에 보내고 결과를 한 번에 기록한다. 반환: 실제로 보낸 수"""
+        breaker = circuit_breaker.get_breaker()
+        capacity = breaker.capacity()
+        if capacity == 0:
+            return 0        # 백엔드가 회복될 때까지 시도 횟수를 쓰지 않고 기다린다
+        # 반열림 상태에서는 시험 요청 수만큼만 꺼낸다
+        rows = self._claim(self.batch if capacity is None else min(self.batch, capacity))
+        if not rows:
+            return 0
+        outcomes = list(self._pool.map(self._send, rows))
+        now = time.time()
+        updates, deferred = [], []
+        for row, (status, http_status, result, error) in zip(rows, outcomes):
+            if status == NOT_SENT:
+                # 보내지 않았으므로 시도 횟수는 그대로 두고 브레이커가 다시 열릴 때쯤 대기로 되돌린다
+                deferred.append((PENDING, now + max(breaker.retry_in(), self.interval), now, row[0]))
+                continue
+            attempts = row[7] + 1
+            if status is None:
+                # 일시적 실패: 횟수를 다 쓰면 실패로, 아니면 잠시 뒤 다시
+                status = FAILED if attempts >= self.max_attempts else PENDING
+            updates.append((status, attempts, now + backoff(attempts), http_status, result, error, now, row[0]))
+            metrics.get_metrics().inc("app_outbox_total", endpoint=row[2], outcome=status)
+        with self._lock:
+            self._db.executemany(
+                "UPDATE outbox SET status = ?, attempts = ?, next_at = ?, http_status = ?, result = ?, error = ?,"
+                " updated_at = ? WHERE id = ?",
+                updates,
+            )
+            self._db.executemany("UPDATE outbox SET status = ?, next_at = ?, updated_at = ? WHERE id = ?", deferred)
+        return len(updates)
+
+    def flush_now(self):
+        # 백오프 대기 중인 항목도 지금 바로 보내도록 깨운다
+        with self._lock:
+            self._db.execute("UPDATE outbox SET next_at = ? WHERE status = ?", (time.time(), PENDING))
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.flush_once()
+            except Exception as e:
+                log.warning("전송 대기열 처리 오류: %s", e)
+                processed = 0
+            if not processed:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="outbox-flush", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False)
+
+
+class OfflineFrames:
+    """
+    실시간 카메라 페이지에서 백엔드에 닿지 않을 때 프레임을 대기열에 접수한다.
+    같은 학생이 서 있는 동안 매 프레임이 쌓이지 않도록 세션당 interval 초에 한 장만 받는다.
+    captured_at 을 함께 보내 나중에 전송돼도 찍힌 시각으로 출석을 기록할 수 있게 한다.
+    """
+
+    def __init__(self, endpoint, kiosk, queue=None, interval=OUTBOX_LIVE_INTERVAL):
+        self.endpoint = endpoint
+        self.kiosk = kiosk
+        self.queue = queue or get_outbox()
+        self.interval = interval
+        self._last = 0.0
+
+    def put(self, jpeg):
+        """접수했으면 True"""
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            return False
+        self._last = now
+        captured_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.queue.enqueue(self.endpoint, data={"kiosk": self.kiosk, "captured_at": captured_at},
+                           file_part=("frame.jpg", jpeg, "image/jpeg"))
+        metrics.get_metrics().inc("app_outbox_live_queued_total", endpoint=self.endpoint, kiosk=self.kiosk)
+        return True
+
+
+@st.cache_resource(show_spinner=False)
+def get_outbox():
+    return Outbox().start()
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import threading
+
+import altair as alt
+import cv2
+import numpy as np
+import pandas as pd
+import streamlit as st
+from cachetools import LRUCache
+
+SCORE_THRESHOLD = 0.4
+KNOWN_COLOR = (0, 255, 0)       # RGB
+UNKNOWN_COLOR = (255, 0, 0)
+
+
+def face_label(i, dic):
+    # unknown 은 이름 대신 순번으로 표시
+    name = dic.get("student_name")
+    return str(i) if name in (None, "unknown") else name
+
+
+def draw_detections(img, detail):
+    """
+    이미 디코딩된 RGB 배열 위에 박스와 '이름 점수' 라벨을 한 번에 그린 복사본을 돌려준다.
+    """
+    out = np.array(img, copy=True)
+    font, scale, thick = cv2.FONT_HERSHEY_SIMPLEX, max(0.4, out.shape[1] / 1600), 1
+    for i, dic in enumerate(detail):
+        xmin, ymin, xmax, ymax = map(int, dic.get("points"))
+        color = UNKNOWN_COLOR if dic.get("student_name") == "unknown" else KNOWN_COLOR
+        cv2.rectangle(out, (xmin, ymin), (xmax, ymax), color, 2)
+
+        text = f"{face_label(i, dic)} {dic.get('score') or 0:.2f}"
+        (tw, th), base = cv2.getTextSize(text, font, scale, thick)
+        ty = max(ymin, th + base)
+        cv2.rectangle(out, (xmin, ty - th - base), (xmin + tw, ty), color, cv2.FILLED)
+        cv2.putText(out, text, (xmin, ty - base), font, scale, (0, 0, 0), thick, cv2.LINE_AA)
+    return out
+
+
+def score_chart(detail, threshold=SCORE_THRESHOLD):
+    # matplotlib 대신 브라우저에서 그리는 Vega-Lite 차트 (figure 생성/누수 없음)
+    df = pd.DataFrame({
+        "face": [face_label(i, dic) for i, dic in enumerate(detail)],
+        "score": [dic.get("score") or 0.0 for dic in detail],
+    })
+    df["pass"] = df["score"] > threshold
+    bars = alt.Chart(df).mark_bar().encode(
+        x=alt.X("score:Q", scale=alt.Scale(domain=[0, 1])),
+        y=alt.Y("face:N", sort=None, title=None),
+        color=alt.Color("pass:N", scale=alt.Scale(domain=[True, False], range=["red", "gray"]), legend=None),
+    )
+    rule = alt.Chart(pd.DataFrame({"score": [threshold]})).mark_rule(color="red", strokeDash=[4, 4]).encode(x="score:Q")
+    return (bars + rule).properties(height=max(120, 22 * len(df)))
+
+
+def detail_digest(detail):
+    # 같은 사진이라도 인식 결과가 바뀌면(새 학생 등록 등) 다시 그려야 한다
+    raw = json.dumps(detail, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class OverlayCache:
+    """(사진 캐시 키, 인식 결과)별로 그려둔 JPEG 을 보관해, 같은 결과를 다시 볼 때 다시 그리지 않는다."""
+
+    def __init__(self, maxsize=32):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def render(self, key, img, detail):
+        key = (key, detail_digest(detail))
+        with self._lock:
+            hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        annotated = draw_detections(img, detail)
+        _, buf = cv2.imencode(".jpg", cv2.cvtColor(annotated, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+        encoded = buf.tobytes()
+        with self._lock:
+            self._cache[key] = encoded
+        return encoded
+
+
+@st.cache_resource(show_spinner=False)
+def get_overlay_cache():
+    return OverlayCache()
@@ -0,0 +1,102 @@
+"""
+페이지 목록(메뉴) 레지스트리.
+
+매 rerun 마다 ./pages 를 glob 하지 않도록 한 번 만든 목록을 프로세스 전체에서 재사용한다.
+DEV_MODE=1 이면 pages 폴더들의 수정 시각이 바뀔 때(파일 추가/삭제/이름 변경) 다시 만든다.
+
+페이지별 import 시간 보고서:
+    python page_registry.py
+"""
+import ast
+import glob
+import os
+import subprocess
+import sys
+
+import streamlit as st
+
+from config import DEV_MODE
+
+PAGES_DIR = "./pages"
+
+
+def _signature():
+    # 폴더 mtime 은 안의 파일이 추가/삭제/이름 변경될 때 바뀐다
+    dirs = [PAGES_DIR] + sorted(glob.glob(PAGES_DIR + "/*/"))
+    return tuple((d, os.stat(d).st_mtime_ns) for d in dirs)
+
+
+def page_title(file_path):
+    return os.path.split(file_path)[1][:-3].replace('_', ' ')
+
+
+@st.cache_resource(show_spinner=False)
+def _scan(signature):
+    groups = []
+    for i, path in enumerate(sorted(glob.glob(PAGES_DIR + '/*'))):
+        if not os.path.isdir(path):
+            continue
+        files = [f for f in sorted(glob.glob(path + '/*')) if f.endswith('.py')]
+        groups.append({"index": i, "menu": path.replace(PAGES_DIR + '/', ''), "files": files})
+    return groups
+
+
+def page_groups(is_admin):
+    """[{index, menu, files}] — 관리자가 아니면 앞의 두 메뉴(홈, 얼굴 등록)만"""
+    groups = _scan(_signature() if DEV_MODE else None)
+    return [g for g in groups if g["index"] <= 1 or is_admin]
+
+
+# ---------------------------
+# import 시간 보고서
+# ---------------------------
+def top_level_imports(file_path):
+    # 페이지 모듈 최상단에서 import 하는 모듈 이름 (함수 안의 지연 import 는 제외)
+    with open(file_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def cold_import_time(modules):
+    """
+    새 인터프리터에서 modules 를 차례로 import 하며 -X importtime 으로 측정한다.
+    반환: {모듈: 누적 초} (앞의 모듈이 이미 불러온 하위 모듈은 중복 집계하지 않음)
+    """
+    code = "\n".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue                # 하위 모듈 (들여쓰기) 또는 헤더
+        name = name.strip()
+        if name in modules:
+            times[name] = int(cumulative) / 1e6
+    return times
+
+
+def import_report():
+    report = []
+    for group in _scan(None):
+        for file_path in group["files"]:
+            times = cold_import_time(top_level_imports(file_path))
+            report.append((file_path, sum(times.values()), sorted(times.items(), key=lambda kv: -kv[1])))
+    return report
+
+
+if __name__ == "__main__":
+    for file_path, total, times in import_report():
+        print(f"{total:7.3f}s  {file_path}")
+        for name, sec in times[:5]:
+            print(f"         {sec:7.3f}s  {name}")
@@ -1,27 +1,21 @@
 import streamlit as st
-import glob,os
+import page_registry
 
 st.set_page_config(page_title="메인 페이지", page_icon="🏠")
 st.title("🏠 얼굴 인식 출석 시스템")
 st.subheader("메인 페이지")
 st.write("아래에서 원하는 기능을 선택하세요 👇")
 
-for i,path in enumerate(sorted(glob.glob('./pages/*'))): 
-    if not os.path.isdir(path):
-        continue
-    if i>1 and not st.session_state["is_admin"]:
-        continue
-    menu = path.replace('./pages/','')[2:]
+for group in page_registry.page_groups(st.session_state["is_admin"]):
+    menu = group["menu"][2:]
     if '홈' in menu:
         continue
     st.subheader(menu)
-    files = sorted(glob.glob(path+'/*'))
+    files = group["files"]
 
     for col, file_path in zip(st.columns(len(files)), files):
         with col:
-            file = os.path.split(file_path)[1]
-            title = file[:-3].replace('_',' ')
-            if st.button(title):
+            if st.button(page_registry.page_title(file_path)):
                 st.switch_page(file_path)
     st.divider()
 
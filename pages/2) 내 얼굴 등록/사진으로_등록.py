@@ -1,13 +1,75 @@
 import streamlit as st
 import requests
 import os
+import time
 
-from config import BACK_URL
+import api_client
+import metrics
+import outbox
+from image_prep import prepare_upload
+import result_cache
+from config import BULK_WORKERS, BACK_OUTBOX
 
 st.title("🖼️ 사진으로 얼굴 등록하기")
 
 
-API_URL =BACK_URL+'/regist'
+API_PATH = '/regist'
+metrics.set_page("regist_photo")
+results = result_cache.get_result_cache()
+
+# ---------------------------
+# 일괄 등록 (관리자 전용)
+# ---------------------------
+def render_bulk_mode():
+    import bulk_regist
+    st.caption("사진 ZIP 과 명단 CSV(student_name, student_id, filename)를 올리면 여러 명을 동시에 등록합니다. "
+               "중간에 멈춰도 같은 파일로 다시 실행하면 이어서 진행합니다.")
+    with st.form("bulk_form"):
+        photos_zip = st.file_uploader("사진 ZIP", type=["zip"])
+        roster = st.file_uploader("명단 CSV", type=["csv"])
+        workers = st.slider("동시 업로드 수", 1, 32, BULK_WORKERS)
+        bulk_submitted = st.form_submit_button("일괄 등록 시작")
+
+    if not bulk_submitted:
+        return
+    if not photos_zip or not roster:
+        st.error("ZIP 과 CSV 를 모두 업로드하세요.")
+        return
+    try:
+        rows = bulk_regist.read_roster(roster.getvalue())
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    manifest = bulk_regist.Manifest(bulk_regist.run_id_for(photos_zip.getvalue(), roster.getvalue()))
+    skipped = sum(bulk_regist.Manifest.key(row) in manifest.done for row in rows)
+    if skipped:
+        st.info(f"이전 실행에서 이미 등록된 {skipped}명은 건너뜁니다.")
+
+    total = len(rows) - skipped
+    progress = st.progress(0.0, text="업로드 준비 중...")
+    failures = []
+    done = 0
+    started = time.time()
+    for row, ok, message in bulk_regist.run_bulk(photos_zip, rows, manifest, workers=workers):
+        done += 1
+        if not ok:
+            failures.append({**row, "message": message})
+        rate = done / max(time.time() - started, 1e-6)
+        progress.progress(done / total, text=f"{done}/{total} 완료 · {rate:.1f}건/초 · 실패 {len(failures)}건")
+
+    if total == 0:
+        progress.progress(1.0, text="등록할 항목이 없습니다.")
+    st.success(f"일괄 등록 완료: 성공 {done - len(failures)}건, 실패 {len(failures)}건")
+    if failures:
+        st.dataframe(failures, width="stretch")
+
+
+if st.session_state.get("is_admin"):
+    mode = st.radio("등록 방식", ["한 명씩", "일괄 등록 (ZIP + CSV)"], horizontal=True)
+    if mode != "한 명씩":
+        render_bulk_mode()
+        st.stop()
 
 
 with st.form("upload_form"):
@@ -26,18 +88,44 @@ if submitted:
     else:
         try:
             # 파일 파트: 키 이름은 반드시 'file'
-            files = {
-                "file": (image.name, image.getvalue(), image.type or "application/octet-stream")
-            }
+            # EXIF 회전 적용 + 축소 + 재인코딩 후 전송
+            files = {"file": prepare_upload(image).file_part()}
             # 폼 데이터: 
             data = {"student_name": student_name,'student_id':student_id}
 
+            # 같은 학생에게 같은 사진을 다시 등록하면 캐시된 응답을 보여준다
+            cache_key = result_cache.content_key(API_PATH, files["file"][1], extra=data)
+            cached = results.get(cache_key)
+            if cached:
+                result, age = cached
+                st.info(f"⚡ 이미 등록된 사진입니다 ({age:.0f}초 전 등록)")
+                st.json(result)
+                st.image(image, caption="업로드 미리보기")
+                st.stop()
+
+            if BACK_OUTBOX:
+                # 백엔드 응답을 기다리지 않고 대기열에 접수 → 백그라운드에서 전송/재시도
+                queue = outbox.get_outbox()
+                item = queue.status(queue.enqueue(API_PATH, data=data, file_part=files["file"]))
+                if item["status"] == outbox.DONE:
+                    st.success("성공 🎉")
+                    results.put(cache_key, item["result"])
+                    st.json(item["result"])
+                else:
+                    st.success(f"접수되었습니다 ({outbox.describe_item(item)}). 백엔드로 자동 전송됩니다.")
+                    st.caption(f"전송 대기열: {outbox.describe_depth(queue.depth())}")
+                st.image(image, caption="업로드 미리보기")
+                st.stop()
+
             with st.spinner("전송 중..."):
-                resp = requests.post(API_URL, data=data, files=files, timeout=60)
+                resp = api_client.post(API_PATH, data=data, files=files, deadline=api_client.deadline("photo"))
 
             if resp.ok:
                 st.success("성공 🎉")
-                st.json(resp.json())
+                with metrics.timer("parse"):
+                    result = resp.json()
+                results.put(cache_key, result)
+                st.json(result)
                 st.image(image, caption="업로드 미리보기")
             else:
                 st.error(f"실패: {resp.status_code}\n{resp.text}")
@@ -2,10 +2,110 @@ import streamlit as st
 import requests
 import os
 
-from config import BACK_URL
+import api_client
+import metrics
+import outbox
+from config import BACK_OUTBOX
 
 st.title("📷 카메라로 얼굴 등록하기")
 
+API_PATH = '/regist'
+BURST_FRAMES = 12                # 연속 촬영으로 모아 둘 최근 프레임 수
+BURST_INTERVAL = 0.15            # 프레임 저장 간격(초)
+
+
+# ---------------------------
+# 연속 촬영: 최근 프레임 중 선명하고 밝고 얼굴이 큰 k 장만 등록
+# ---------------------------
+def render_burst_mode():
+    import collections, threading, time
+    from streamlit_webrtc import webrtc_streamer, VideoProcessorBase
+    import capture_quality
+    import face_crop
+
+    class BurstRecorder(VideoProcessorBase):
+        def __init__(self):
+            self.frames = collections.deque(maxlen=BURST_FRAMES)
+            self.lock = threading.Lock()
+            self._last = 0.0
+
+        def recv(self, frame):
+            now = time.monotonic()
+            if now - self._last >= BURST_INTERVAL:
+                self._last = now
+                img = frame.to_ndarray(format="rgb24")
+                with self.lock:
+                    self.frames.append(img)
+            return frame            # 화면은 그대로 (변환/그리기 없음)
+
+        def snapshot(self):
+            with self.lock:
+                return list(self.frames)
+
+    st.caption(f"카메라를 켜고 얼굴을 화면 가운데에 두세요. 등록을 누르면 최근 {BURST_FRAMES}장 중 "
+               "선명도·밝기·얼굴 크기 점수가 높은 사진만 업로드합니다.")
+    ctx = webrtc_streamer(key="burst-regist", video_processor_factory=BurstRecorder,
+                          media_stream_constraints={"video": {"facingMode": "user"}, "audio": False})
+
+    with st.form("burst_form"):
+        student_name = st.text_input("이름 (필수, 영문)")
+        student_id = st.text_input("교번 (필수)")
+        k = st.slider("업로드할 사진 수", 1, 5, 3)
+        submitted = st.form_submit_button("등록")
+
+    if not submitted:
+        return
+    if not student_name or not student_id:
+        st.error("이름과 학번(교번)은 필수입니다.")
+        return
+    frames = ctx.video_processor.snapshot() if ctx and ctx.video_processor else []
+    if not frames:
+        st.error("카메라를 먼저 켜 주세요.")
+        return
+
+    rows = capture_quality.score_frames(frames, is_rgb=True)
+    best = capture_quality.best_k(rows, k)
+    st.dataframe(
+        [{"프레임": r["index"], "점수": round(r["score"], 3), "선명도": round(r["sharpness"], 1),
+          "밝기": round(r["brightness"], 2), "얼굴 크기": f"{r['face_ratio']:.1%}",
+          "선택": r in best} for r in rows],
+        width="stretch", hide_index=True,
+    )
+    if not best:
+        st.error("얼굴이 검출된 프레임이 없습니다. 얼굴을 화면 가운데에 두고 다시 시도하세요.")
+        return
+
+    st.image([frames[r["index"]] for r in best], caption=[f"#{r['index']} 점수 {r['score']:.2f}" for r in best],
+             width=160)
+    data = {"student_name": student_name, "student_id": student_id}
+    deadline = api_client.deadline("photo")     # k 장 전체가 한 마감을 공유
+    ok = 0
+    with st.spinner(f"{len(best)}장 전송 중..."):
+        for r in best:
+            file_part = (f"burst_{r['index']}.jpg", face_crop.encode_jpeg(frames[r["index"]], is_rgb=True), "image/jpeg")
+            try:
+                if BACK_OUTBOX:
+                    outbox.get_outbox().enqueue(API_PATH, data=data, file_part=file_part)
+                    ok += 1
+                    continue
+                resp = api_client.post(API_PATH, data=data, files={"file": file_part}, deadline=deadline)
+                if resp.ok:
+                    ok += 1
+                else:
+                    st.error(f"실패 (프레임 #{r['index']}): {resp.status_code}\n{resp.text}")
+            except requests.exceptions.RequestException as e:
+                st.error(f"네트워크 오류: {e}")
+                break
+    if ok:
+        st.success(f"{'접수' if BACK_OUTBOX else '등록'} 완료: {ok}/{len(best)}장 🎉")
+
+
+mode = st.radio("촬영 방식", ["한 장 촬영", "연속 촬영 (좋은 사진 자동 선택)"], horizontal=True)
+if mode != "한 장 촬영":
+    metrics.set_page("regist_burst")
+    render_burst_mode()
+    st.stop()
+
 # 카메라 입력
 img_file = st.camera_input("얼굴을 촬영하세요")
 
@@ -13,7 +113,7 @@ img_file = st.camera_input("얼굴을 촬영하세요")
 st.set_page_config(page_title="업로드", page_icon="📤")
 st.title("텍스트 + 이미지 → FastAPI /regist")
 
-API_URL =BACK_URL+'/regist'
+metrics.set_page("regist_camera")
 
 
 with st.form("upload_form"):
@@ -38,12 +138,27 @@ if submitted:
             # 폼 데이터: 
             data = {"student_name": student_name,'student_id':student_id}
 
+            if BACK_OUTBOX:
+                # 백엔드 응답을 기다리지 않고 대기열에 접수 → 백그라운드에서 전송/재시도
+                queue = outbox.get_outbox()
+                item = queue.status(queue.enqueue(API_PATH, data=data, file_part=files["file"]))
+                if item["status"] == outbox.DONE:
+                    st.success("성공 🎉")
+                    st.json(item["result"])
+                else:
+                    st.success(f"접수되었습니다 ({outbox.describe_item(item)}). 백엔드로 자동 전송됩니다.")
+                    st.caption(f"전송 대기열: {outbox.describe_depth(queue.depth())}")
+                st.image(image, caption="업로드 미리보기")
+                st.stop()
+
             with st.spinner("전송 중..."):
-                resp = requests.post(API_URL, data=data, files=files, timeout=60)
+                resp = api_client.post(API_PATH, data=data, files=files, deadline=api_client.deadline("photo"))
 
             if resp.ok:
                 st.success("성공 🎉")
-                st.json(resp.json())
+                with metrics.timer("parse"):
+                    result = resp.json()
+                st.json(result)
                 st.image(image, caption="업로드 미리보기")
             else:
                 st.error(f"실패: {resp.status_code}\n{resp.text}")
@@ -1,14 +1,25 @@
+import datetime as dt
+
 import streamlit as st
 import requests
 
-from config import BACK_URL
+import api_client
+import metrics
+import outbox
+import result_cache
+from config import BACK_OUTBOX
+from image_prep import prepare_upload
 
 st.title("🖼️ 사진으로 얼굴 확인하기")
 st.caption("이미지 한 장을 업로드하면 FastAPI로 보내서 누구인지 확인합니다.")
 
-API_URL =BACK_URL+'/predict'
+API_PATH = '/predict'
+metrics.set_page("predict_one_photo")
+
+results = result_cache.get_result_cache()
 
 show_raw = st.checkbox("서버 원본 응답(JSON)도 표시", value=False)
+crop_mode = st.checkbox("얼굴만 잘라서 전송 (브라우저 측 얼굴 검출)", value=False)
 
 image = st.file_uploader("이미지 업로드", type=["jpg", "jpeg", "png", "webp"])
 
@@ -20,44 +31,78 @@ if st.button("식별 요청 보내기"):
         st.error("이미지를 업로드하세요.")
     else:
         try:
-            files = {"file": (image.name, image.getvalue(), image.type or "application/octet-stream")}
-            with st.spinner("식별 중..."):
-                resp = requests.post(API_URL, files=files, timeout=60)
-            if not resp.ok:
-                st.error(f"요청 실패: {resp.status_code}\n{resp.text}")
+            prepared = prepare_upload(image)
+            if crop_mode:
+                # 가장 큰 얼굴 하나만 잘라서 전송 (cv2 는 이 경로에서만 불러온다)
+                import numpy as np
+                import face_crop
+                full = np.asarray(prepared.image)
+                boxes = face_crop.detect_faces(full, is_rgb=True)
+                if not boxes:
+                    st.warning("얼굴이 검출되지 않아 요청을 보내지 않았습니다.")
+                    st.stop()
+                crop = face_crop.largest_face_crop(full, boxes)
+                files = {"file": ("face.jpg", face_crop.encode_jpeg(crop, is_rgb=True), "image/jpeg")}
             else:
-                data = resp.json()
-                if show_raw:
-                    st.subheader("Raw Response")
-                    st.json(data)
+                files = {"file": prepared.file_part()}
+            # 같은 이미지를 다시 보내면 백엔드 호출 없이 캐시된 결과 사용
+            cache_key = result_cache.content_key(API_PATH, files["file"][1])
+            cached = results.get(cache_key)
+            if cached:
+                data, age = cached
+                st.info(f"⚡ 캐시된 결과입니다 ({age:.0f}초 전 응답)")
+            elif BACK_OUTBOX:
+                # 대기열에 접수하고, 전송이 끝났으면 그 결과를 사용 (같은 사진은 하루에 한 번만 처리)
+                queue = outbox.get_outbox()
+                item = queue.status(queue.enqueue(API_PATH, file_part=files["file"],
+                                                  extra={"date": dt.date.today().isoformat()}))
+                if item["status"] != outbox.DONE:
+                    st.info(f"접수되었습니다 ({outbox.describe_item(item)}). "
+                            "잠시 후 다시 누르면 결과를 확인할 수 있습니다.")
+                    st.caption(f"전송 대기열: {outbox.describe_depth(queue.depth())}")
+                    st.stop()
+                data = item["result"]
+                results.put(cache_key, data)
+            else:
+                with st.spinner("식별 중..."):
+                    resp = api_client.post(API_PATH, files=files, deadline=api_client.deadline("photo"))
+                if not resp.ok:
+                    st.error(f"요청 실패: {resp.status_code}\n{resp.text}")
+                    st.stop()
+                with metrics.timer("parse"):
+                    data = resp.json()
+                results.put(cache_key, data)
+            if show_raw:
+                st.subheader("Raw Response")
+                st.json(data)
 
-                name = None
-                conf = None
-                candidates = None
+            name = None
+            conf = None
+            candidates = None
 
-                if isinstance(data, dict):
-                    if "student_id" in data:
-                        name = data.get("student_id")
-                        conf = data.get("score")
-                    else:
-                        candidates = None
+            if isinstance(data, dict):
+                if "student_id" in data:
+                    name = data.get("student_id")
+                    conf = data.get("score")
                 else:
                     candidates = None
+            else:
+                candidates = None
 
-                if name:
-                    st.success(f"식별 결과: **{name}**"
-                               + (f"  (confidence: {conf:.3f})" if isinstance(conf, (int, float)) else ""))
-                # elif candidates:
-                #     st.subheader("후보 결과")
-                #     # 상위 5개만 표시
-                #     rows = []
-                #     for c in candidates[:5]:
-                #         rows.append({
-                #             "name": c.get("name") or c.get("identity") or "unknown",
-                #             "confidence": c.get("confidence") or c.get("score"),
-                #         })
-                #     st.dataframe(rows, use_container_width=True)
-                else:
-                    st.warning("응답을 해석할 수 없습니다. 서버 응답 스키마를 확인하세요.")
+            if name:
+                st.success(f"식별 결과: **{name}**"
+                           + (f"  (confidence: {conf:.3f})" if isinstance(conf, (int, float)) else ""))
+            # elif candidates:
+            #     st.subheader("후보 결과")
+            #     # 상위 5개만 표시
+            #     rows = []
+            #     for c in candidates[:5]:
+            #         rows.append({
+            #             "name": c.get("name") or c.get("identity") or "unknown",
+            #             "confidence": c.get("confidence") or c.get("score"),
+            #         })
+            #     st.dataframe(rows, use_container_width=True)
+            else:
+                st.warning("응답을 해석할 수 없습니다. 서버 응답 스키마를 확인하세요.")
         except requests.exceptions.RequestException as e:
             st.error(f"네트워크 오류: {e}")
@@ -1,17 +1,59 @@
+import datetime as dt
+
 import streamlit as st
 import requests
-import os
-import cv2
-import numpy as np
-from PIL import Image
-from config import BACK_URL
-import matplotlib.pyplot as plt
+import api_client
+import metrics
+import outbox
+import result_cache
+from config import BATCH_WORKERS, BACK_OUTBOX
+from image_prep import prepare_upload
 
 st.title("🖼️ 사진으로 얼굴 확인하기")
 st.caption("이미지 한 장을 업로드하면 FastAPI로 보내서 누구인지 확인합니다.")
-API_URL =BACK_URL+'/predict_many'
+API_PATH = '/predict_many'
+metrics.set_page("predict_many_photo")
+
+results = result_cache.get_result_cache()
+
+# ---------------------------
+# 여러 장 일괄 식별
+# ---------------------------
+def render_batch_mode():
+    import batch_predict
+    uploads = st.file_uploader("이미지 또는 ZIP 업로드 (여러 개 선택 가능)",
+                               type=["jpg", "jpeg", "png", "webp", "zip"], accept_multiple_files=True)
+    workers = st.slider("동시 요청 수", 1, 16, BATCH_WORKERS)
+    if not st.button("일괄 식별 시작"):
+        return
+    if not uploads:
+        st.error("이미지를 업로드하세요.")
+        return
+
+    images = list(batch_predict.iter_images(uploads))
+    progress = st.progress(0.0, text=f"0/{len(images)}")
+    table = st.empty()
+    rows = []
+    for row in batch_predict.run_batch(images, results, workers=workers):
+        rows.append(row)
+        progress.progress(len(rows) / len(images), text=f"{len(rows)}/{len(images)}")
+        table.dataframe(
+            [{k: r[k] for k in ("image", "known", "unknown", "cached", "error")} for r in rows],
+            width="stretch",
+        )
+
+    summary = batch_predict.summarize(rows)
+    st.subheader(f"👀 인식된 학생 {len(summary)}명")
+    st.dataframe(summary, width="stretch")
+
+
+mode = st.radio("확인 방식", ["한 장", "여러 장 일괄"], horizontal=True)
+if mode != "한 장":
+    render_batch_mode()
+    st.stop()
 
 show_raw = st.checkbox("서버 원본 응답(JSON)도 표시", value=False)
+crop_mode = st.checkbox("얼굴만 잘라서 전송 (브라우저 측 얼굴 검출)", value=False)
 
 image = st.file_uploader("이미지 업로드", type=["jpg", "jpeg", "png", "webp"])
 
@@ -23,51 +65,73 @@ if st.button("식별 요청 보내기"):
         st.error("이미지를 업로드하세요.")
     else:
         try:
-            files = {"file": (image.name, image.getvalue(), image.type or "application/octet-stream")}
-            with st.spinner("식별 중..."):
-                resp = requests.post(API_URL, files=files, timeout=60)
-            if not resp.ok:
-                st.error(f"요청 실패: {resp.status_code}\n{resp.text}")
+            tiles = None
+            prepared = prepare_upload(image)
+            if crop_mode:
+                # 얼굴 crop 만 모자이크로 모아 전송, 좌표는 tiles 로 복원 (cv2 는 이 경로에서만 불러온다)
+                import numpy as np
+                import face_crop
+                full = np.asarray(prepared.image)
+                boxes = face_crop.detect_faces(full, is_rgb=True)
+                if not boxes:
+                    st.warning("얼굴이 검출되지 않아 요청을 보내지 않았습니다.")
+                    st.stop()
+                mosaic, tiles = face_crop.build_mosaic(full, boxes)
+                files = {"file": ("faces.jpg", face_crop.encode_jpeg(mosaic, is_rgb=True), "image/jpeg")}
+                st.caption(f"검출된 얼굴 {len(boxes)}개만 전송 ({len(files['file'][1]) / 1024:.0f} KB)")
+            else:
+                files = {"file": prepared.file_part()}
+            # 같은 이미지를 다시 보내면 백엔드 호출 없이 캐시된 결과 사용
+            cache_key = result_cache.content_key(API_PATH, files["file"][1])
+            cached = results.get(cache_key)
+            if cached:
+                data, age = cached
+                st.info(f"⚡ 캐시된 결과입니다 ({age:.0f}초 전 응답)")
+            elif BACK_OUTBOX:
+                # 대기열에 접수하고, 전송이 끝났으면 그 결과를 사용 (같은 사진은 하루에 한 번만 처리)
+                queue = outbox.get_outbox()
+                item = queue.status(queue.enqueue(API_PATH, file_part=files["file"],
+                                                  extra={"date": dt.date.today().isoformat()}))
+                if item["status"] != outbox.DONE:
+                    st.info(f"접수되었습니다 ({outbox.describe_item(item)}). "
+                            "잠시 후 다시 누르면 결과를 확인할 수 있습니다.")
+                    st.caption(f"전송 대기열: {outbox.describe_depth(queue.depth())}")
+                    st.stop()
+                data = item["result"]
+                results.put(cache_key, data)
+            else:
+                with st.spinner("식별 중..."):
+                    resp = api_client.post(API_PATH, files=files, deadline=api_client.deadline("photo"))
+                if not resp.ok:
+                    st.error(f"요청 실패: {resp.status_code}\n{resp.text}")
+                    st.stop()
+                with metrics.timer("parse"):
+                    data = resp.json()
+                results.put(cache_key, data)
+            if tiles is not None and isinstance(data, dict):
+                data = face_crop.remap_detail(data, tiles)
+            if show_raw:
+                st.subheader("Raw Response")
+                st.json(data)
+
+            name = None
+            conf = None
+            candidates = None
+
+            if isinstance(data, dict):
+                known, unknown = data.get("known"), data.get("unknown")
+                st.success(f"식별 결과: Recognized: {known} Unrecognized: {unknown}")
+
+                # 전처리 때 이미 디코딩한 이미지 위에 그린다 (points 도 같은 좌표계)
+                import overlay
+                overlays = overlay.get_overlay_cache()
+                detail = data.get('detail') or []
+                with metrics.timer("render"):
+                    st.image(overlays.render(cache_key, prepared.image, detail))
+                    if detail:
+                        st.altair_chart(overlay.score_chart(detail))    # 1.50 기본값이 컨테이너 폭 (width="stretch" 와 같음)
+
             else:
-                data = resp.json()
-                if show_raw:
-                    st.subheader("Raw Response")
-                    st.json(data)
-
-                name = None
-                conf = None
-                candidates = None
-
-                if isinstance(data, dict):
-                    known, unknown = data.get("known"), data.get("unknown")
-                    st.success(f"식별 결과: Recognized: {known} Unrecognized: {unknown}")
-
-                    pil_img = Image.open(image)
-                    img = np.array(pil_img)
-                    y = []
-                    x = []
-                    for i,dic in enumerate(data.get('detail')):
-                        xmin, ymin,xmax, ymax = dic.get('points')
-                        if 'unknown' == dic.get('student_name'):
-                            cv2.rectangle(img, (xmin, ymin), (xmax, ymax), (255,0,0), 2)
-                            x.append(i)
-                        else:
-                            cv2.rectangle(img, (xmin, ymin), (xmax, ymax), (0,255,0), 2)
-                            x.append(dic.get('student_name'))
-                        y.append(dic.get('score'))
-                    st.image(img)
-                    y2 = [ ['gray','red'][i>0.4] for i in y]
-                    # fig,ax= plt.subplots()
-                    fig,ax= plt.subplots(figsize=(6, 10))
-                    ax.barh(range(len(y)),y,color=y2)
-                    ax.set_yticks(range(len(y)))
-                    ax.set_yticklabels(x)
-                    ax.axvline(0.4, color='red', linestyle='--', linewidth=1)
-                    st.pyplot(fig)
-
-
-                    
-                else:
-                    st.warning("응답을 해석할 수 없습니다. 서버 응답 스키마를 확인하세요.")
+                st.warning("응답을 해석할 수 없습니다. 서버 응답 스키마를 확인하세요.")
         except requests.exceptions.RequestException as e:
             st.error(f"네트워크 오류: {e}")
@@ -1,62 +1,169 @@
 import streamlit as st
-from streamlit_webrtc import webrtc_streamer, VideoProcessorBase, WebRtcMode
-import threading, requests, cv2, av, time
-from config import BACK_URL
+from streamlit_webrtc import webrtc_streamer, VideoProcessorBase
+import logging, threading, cv2, time
+import requests
+import api_client
+import metrics
+import outbox
+from config import METRICS_OVERLAY, SEND_ADAPTIVE, CAPTURE_WIDTH, KIOSK_ID, LIVE_DEADLINE, BACK_OUTBOX
+from live_worker import InferenceWorker
+from face_tracker import FaceTracker
+from checkin_cache import get_checkin_cache
+from frame_path import FrameBudget, SendBuffers, SendQualityController, scale_boxes, unscale_detail
+import face_crop
+from stream_transport import FrameTransport
 
 
-API_URL =BACK_URL+'/predict_many'
-SEND_EVERY_N_FRAMES = 100                        # 몇 프레임마다 전송할지 설정
+API_PATH = '/predict_many'
+SEND_MIN_INTERVAL = 0.5                          # 새 얼굴/추적 끊김이 있어도 최소 이 간격(초)은 두고 전송
+SEND_MAX_INTERVAL = 10.0                         # 얼굴 변화가 없어도 이 간격(초)마다 라벨 갱신
+MAX_IN_FLIGHT = 1                                # 세션당 동시에 보낼 수 있는 요청 수
+PAGE = "camera_many"                              # 지표 라벨
+CLIENT_FACE_DETECT = True                        # 얼굴 crop 만 전송 (얼굴이 없으면 요청 생략)
+
+log = logging.getLogger(f"pages.{PAGE}")
 
 st.title("📷 실시간 카메라로 확인")
 class VideoProcessor(VideoProcessorBase):
-    def __init__(self):
+    def __init__(self, kiosk=KIOSK_ID):
         self.frame_count = 0
         self.result_label = "..."
-        self.request_interval = SEND_EVERY_N_FRAMES
+        self.kiosk = kiosk
+        self.checkins = get_checkin_cache()            # 세션 간 공유: 최근 출석 확인된 학생
+        # BACK_OUTBOX 면 백엔드에 닿지 않을 때 프레임을 대기열에 접수해 나중에 출석 처리
+        self.offline = outbox.OfflineFrames(API_PATH, kiosk) if BACK_OUTBOX else None
+        # 얼굴을 로컬에서 추적하다가 새 얼굴/추적 끊김이 있을 때만 백엔드에 전송
+        # 화면의 모든 학생이 이미 출석 확인됐으면 주기적 갱신도 보내지 않는다
+        self.tracker = FaceTracker(min_interval=SEND_MIN_INTERVAL, max_interval=SEND_MAX_INTERVAL,
+                                   is_settled=self.settled)
         self.lock = threading.Lock()
+        self.fps = metrics.RateMeter()
+        self.last_rtt = None
+        self.budget = FrameBudget()                   # 프레임 예산을 넘으면 오버레이를 줄인다
+        self.buffers = SendBuffers()                  # 전송 프레임 버퍼 풀 (SEND_MAX_SIDE 로 축소)
+        self.send_quality = SendQualityController()   # RTT/인식 점수로 전송 해상도·JPEG 품질 조절
+        self.transport = FrameTransport(API_PATH)     # BACK_STREAM=1 이면 WebSocket 사용
+        self.worker = InferenceWorker(self.send_frame_to_backend, self.set_result, max_in_flight=MAX_IN_FLIGHT,
+                                      max_age=LIVE_DEADLINE, name=PAGE,
+                                      on_drop=lambda item: self.buffers.release(item[0]))
 
-    def send_frame_to_backend(self, img):
+    def send_frame_to_backend(self, item):
+        buf, boxes, scale = item       # boxes: 추적기가 이미 찾은 얼굴 위치 (다시 검출하지 않음, 축소 좌표)
+        img = buf
+        detail = []
+        tiles = None
+        jpeg = None
         try:
-            _, img_encoded = cv2.imencode('.jpg', img)
-            response = requests.post(
-                API_URL,
-                files={"file": ("frame.jpg", img_encoded.tobytes(), "image/jpeg")},
-                timeout=100  # ✅ 더 넉넉하게
-            )
-            if response.status_code == 200:
-                result = response.json()
-                print('success',result)
+            if CLIENT_FACE_DETECT:
+                if not boxes:
+                    return '...', detail   # 얼굴이 없으면 요청 생략
+                img, tiles = face_crop.build_mosaic(img, boxes)
+            with metrics.timer("encode", PAGE):
+                _, img_encoded = cv2.imencode('.jpg', img, self.send_quality.encode_params())
+            jpeg = img_encoded.tobytes()
+            start = time.perf_counter()
+            status, result = self.transport.predict(jpeg, timeout=LIVE_DEADLINE)  # 다음 전송 전까지만 기다림
+            self.last_rtt = time.perf_counter() - start
+            metrics.observe("network", self.last_rtt, PAGE)
+            if status == 200:
                 known, unknown = result.get("known"), result.get("unknown")
                 label = f"Recognized: {known} Unrecognized: {unknown}"
-            elif response.status_code == 204:
-                label = '...' 
+                if tiles is not None:
+                    result = face_crop.remap_detail(result, tiles)
+                detail = unscale_detail(result.get("detail") or [], scale)
+                scores = [d.get("score") or 0.0 for d in detail]
+                self.send_quality.observe(self.last_rtt, sum(scores) / len(scores) if scores else None)
+            elif status == 204:
+                label = '...'
+                self.send_quality.observe(self.last_rtt)
             else:
                 label = "what's going on?"
-                print(response.json())
+                log.debug("%s 응답 %s: %s", API_PATH, status, result)
+        except (api_client.CircuitOpenError, requests.exceptions.ConnectionError):
+            queued = self.offline is not None and jpeg is not None and self.offline.put(jpeg)
+            label = "Queued offline" if queued else "Backend degraded"
+        except api_client.DeadlineExceeded:
+            # 마감까지 답이 없었던 것도 왕복 시간으로 반영해야 전송 품질을 낮출 수 있다
+            self.last_rtt = LIVE_DEADLINE
+            self.send_quality.observe(LIVE_DEADLINE)
+            label = "Backend slow"
         except Exception as e:
-            print("🔥 예외 발생:", e)  # ✅ 콘솔에 에러 메시지 출력
+            metrics.get_metrics().inc("app_live_errors_total", page=PAGE, error=type(e).__name__)
+            log.warning("프레임 처리 오류: %s", e)
             label = f"Error except,  {type(e)}"
+        finally:
+            self.buffers.release(buf)
+
+        return label, detail
+
+    def settled(self, student_id):
+        if self.checkins.get(self.kiosk, student_id) is None:
+            return False
+        self.checkins.suppress(self.kiosk)
+        return True
 
+    def set_result(self, result):
+        label, detail = result
+        for d in detail:
+            if d.get("student_id"):
+                self.checkins.put(self.kiosk, d["student_id"], d.get("student_name"), d.get("score"))
+        self.tracker.apply_result(detail)
         with self.lock:
             self.result_label = label
 
     def recv(self, frame):
+        started = time.perf_counter()
         img = frame.to_ndarray(format="bgr24")
         self.frame_count += 1
+        self.fps.tick()
 
-        if self.frame_count % self.request_interval == 0:
-            threading.Thread(target=self.send_frame_to_backend, args=(img.copy(),)).start()
+        if self.tracker.should_send(img):
+            self.buffers.max_side = self.send_quality.max_side
+            # 미리 만든 버퍼에 (축소하며) 한 번만 복사. 원본 img 에는 아래에서 바로 그린다
+            buf, scale = self.buffers.fill(img)
+            if buf is not None:
+                self.worker.submit((buf, scale_boxes(self.tracker.boxes(), scale), scale))
 
         with self.lock:
             label_to_display = self.result_label
 
+        # 예산을 넘기고 있으면 얼굴별 이름 → 박스 → 생략 순으로 줄인다
+        level = self.budget.level
+        if level < FrameBudget.MINIMAL:
+            self.tracker.draw(img, labels=level == FrameBudget.FULL)
         cv2.putText(img, label_to_display, (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 2)
+        if METRICS_OVERLAY and level == FrameBudget.FULL:
+            self.draw_stats(img, time.perf_counter() - started)
+        elapsed = time.perf_counter() - started
+        self.budget.record(elapsed)
+        metrics.observe("frame", elapsed, PAGE)
         return frame.from_ndarray(img, format="bgr24")
 
-webrtc_streamer(key="face-recognition", video_processor_factory=VideoProcessor,
+    def draw_stats(self, img, frame_time):
+        rtt = f"{self.last_rtt * 1000:.0f} ms" if self.last_rtt is not None else "-"
+        text = (f"{self.fps.rate:.1f} fps | frame {frame_time * 1000:.1f} ms | rtt {rtt} | over {self.budget.overruns}"
+                f" | {self.send_quality.max_side}px q{self.send_quality.quality}")
+        cv2.putText(img, text, (10, img.shape[0] - 12), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+    def on_ended(self):
+        # WebRTC 스트림 종료 시 워커 정리
+        self.worker.stop()
+        self.transport.close()
+
+# 캡처 해상도는 연결할 때만 정할 수 있으므로, 바꾸려면 key 를 바꿔 다시 연결한다
+capture_width = st.session_state.get("capture_width", CAPTURE_WIDTH)
+kiosk = st.query_params.get("kiosk", KIOSK_ID)
+ctx = webrtc_streamer(key=f"face-recognition-{capture_width}", video_processor_factory=lambda: VideoProcessor(kiosk),
         media_stream_constraints={
         "video": {
-            "facingMode": "user"       # 전면카메라 (모바일)
+            "facingMode": "user",      # 전면카메라 (모바일)
+            "width": {"ideal": capture_width},
         },
         "audio": False,
-    },)
\ No newline at end of file
+    },)
+
+if SEND_ADAPTIVE and ctx and ctx.video_processor:
+    suggested = ctx.video_processor.send_quality.capture_width()
+    if suggested != capture_width and st.button(f"권장 캡처 해상도({suggested}px)로 다시 연결"):
+        st.session_state["capture_width"] = suggested
+        st.rerun()
\ No newline at end of file
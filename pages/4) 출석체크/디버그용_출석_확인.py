@@ -1,12 +1,14 @@
 import streamlit as st
 import requests
 import os
-from config import BACK_URL
+import api_client
+import metrics
 
 st.set_page_config(page_title="출석체크", page_icon="📤")
 st.title("🕒 디버그용 출석체크확인")
 
-API_URL =BACK_URL+'/attendance_debug'
+API_PATH = '/attendance_debug'
+metrics.set_page("attendance_debug")
 
 
 with st.form("upload_form"):
@@ -22,11 +24,13 @@ if submitted:
             data = {"student_id": student_id}
 
             with st.spinner("전송 중..."):
-                resp = requests.post(API_URL, data=data, timeout=60)
+                resp = api_client.post(API_PATH, data=data, deadline=api_client.deadline("attendance"))
 
             if resp.ok:
                 st.success("성공 🎉")
-                st.json(resp.json())
+                with metrics.timer("parse"):
+                    result = resp.json()
+                st.json(result)
             else:
                 st.error(f"실패: {resp.status_code}\n{resp.text}")
         except requests.exceptions.RequestException as e:
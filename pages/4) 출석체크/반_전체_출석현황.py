@@ -0,0 +1,107 @@
+import streamlit as st
+import pandas as pd
+import datetime as dt
+from datetime import time
+import attendance
+import metrics
+from config import ROSTER_WORKERS
+
+st.set_page_config(page_title="반 전체 출석 현황", page_icon="🏫", layout="wide")
+st.title("🏫 반 전체 출석 현황")
+
+month_cache = attendance.get_month_cache()
+metrics.set_page("attendance_roster")
+
+# ---------------------------
+# 1️⃣ 명단 + 기간 입력
+# ---------------------------
+with st.form("roster_form"):
+    roster_file = st.file_uploader("명단 CSV (student_id 컬럼 필수, student_name 선택)", type=["csv"])
+    roster_text = st.text_area("또는 학번 직접 입력 (줄바꿈/쉼표 구분)")
+
+    col_t1, col_t2 = st.columns(2)
+    start_time = col_t1.time_input("시작 시각 (없으면 00:00)", value=None)
+    end_time = col_t2.time_input("종료 시각 (없으면 23:59)", value=None)
+
+    col_d1, col_d2 = st.columns(2)
+    today = dt.date.today()
+    start_date = col_d1.date_input("조회 시작일", value=today.replace(day=1))
+    end_date = col_d2.date_input("조회 종료일", value=today)
+
+    workers = st.slider("동시 요청 수", 1, 32, ROSTER_WORKERS)
+    export_fmt = st.selectbox("내보내기 형식", list(attendance.EXPORT_FORMATS))
+    submitted = st.form_submit_button("출석 현황 보기")
+
+
+def read_student_ids():
+    if roster_file:
+        roster = pd.read_csv(roster_file, dtype=str, encoding="utf-8-sig")
+        if "student_id" not in roster.columns:
+            st.error("CSV 에 student_id 컬럼이 없습니다.")
+            return []
+        ids = roster["student_id"].dropna().str.strip()
+    else:
+        ids = pd.Series(roster_text.replace(",", "\n").split("\n"), dtype=str).str.strip()
+    return list(dict.fromkeys(ids[ids != ""]))       # 순서 유지 중복 제거
+
+
+# ---------------------------
+# 2️⃣ 동시 조회 + 집계
+# ---------------------------
+if submitted:
+    student_ids = read_student_ids()
+    if not student_ids:
+        st.error("학번을 한 명 이상 입력하세요.")
+        st.stop()
+    if end_date < start_date:
+        st.warning("조회 종료 날짜가 시작 날짜보다 빠릅니다. 범위를 다시 설정해주세요.")
+        st.stop()
+
+    start_time = start_time or time(0, 0, 0)
+    end_time = end_time or time(23, 59, 59)
+
+    progress = st.progress(0.0, text=f"0/{len(student_ids)}명 조회")
+    batches, errors, done = [], {}, 0
+    for sid, student_batches, error in attendance.fetch_roster(
+        student_ids, start_date, end_date, start_time, end_time, month_cache, workers=workers
+    ):
+        batches.extend(student_batches)
+        done += 1
+        if error:
+            errors[sid] = error
+        progress.progress(done / len(student_ids), text=f"{done}/{len(student_ids)}명 조회")
+
+    if errors:
+        st.warning(f"{len(errors)}명 조회 실패")
+        st.dataframe(pd.DataFrame({"student_id": list(errors), "error": list(errors.values())}), width="stretch")
+
+    with metrics.timer("aggregate"):
+        table = attendance.batches_to_table(batches)
+        matrix, student_rate, day_rate = attendance.attendance_matrix(table, student_ids, start_date, end_date)
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("학생 수", len(student_ids))
+    c2.metric("출석 기록", table.num_rows)
+    c3.metric("평균 출석률", f"{student_rate.mean():.0%}")
+
+    ext, mime = attendance.EXPORT_FORMATS[export_fmt]
+    st.download_button(
+        f"⬇️ 전체 출석 기록 {export_fmt} 로 내보내기",
+        attendance.export_attendance(table.to_batches(), export_fmt),
+        file_name=f"attendance_roster_{start_date}_{end_date}.{ext}",
+        mime=mime,
+        on_click="ignore",
+    )
+
+    st.subheader("학생 × 날짜 출석표")
+    view = matrix.copy()
+    view.columns = [d.strftime("%m-%d") for d in view.columns]
+    view.insert(0, "출석률", student_rate)
+    st.dataframe(
+        view,
+        width="stretch",
+        column_config={"출석률": st.column_config.ProgressColumn("출석률", format="percent", min_value=0, max_value=1)},
+    )
+
+    st.subheader("날짜별 출석률")
+    st.bar_chart(pd.Series(day_rate.to_numpy(), index=pd.to_datetime(day_rate.index), name="출석률"))
@@ -3,13 +3,14 @@ import requests
 from datetime import datetime, time
 import datetime as dt
 import calendar
-from config import BACK_URL
+import attendance
+import metrics
 
 st.set_page_config(page_title="월별 출석 확인", page_icon="📅")
 st.title("📅 월별 출석 확인")
 
-API_BASE = BACK_URL.rstrip("/")
-ATTEND_API = f"{API_BASE}/attendance_month"
+month_cache = attendance.get_month_cache()
+metrics.set_page("attendance_month")
 
 # ---------------------------
 # 1️⃣ 검색 전 정보 입력
@@ -27,15 +28,18 @@ with st.form("query_form"):
     start_date = col_d1.date_input("조회 시작일", value=today)
     end_date = col_d2.date_input("조회 종료일", value=today)
 
+    export_fmt = st.selectbox("내보내기 형식", list(attendance.EXPORT_FORMATS))
+
     submitted = st.form_submit_button("출석 달력보기")
 
 # ---------------------------
 # 2️⃣ API 통신
 # ---------------------------
 def fetch_attendance(student_id, start_date, end_date, start_time, end_time):
+    """달마다 (년월, rows, 캐시 여부) 를 받는 대로 내보낸다. 입력이 잘못됐으면 None"""
     if not student_id:
         st.warning("학번은 필수입니다.")
-        return []
+        return None
     # 기본 시간 보정: 시작 미선택 → 00:00, 종료 미선택 → 23:59:59
     start_time = start_time or time(0, 0, 0)
     end_time   = end_time   or time(23, 59, 59)
@@ -43,55 +47,15 @@ def fetch_attendance(student_id, start_date, end_date, start_time, end_time):
     # 유효성 검사 (날짜 범위만)
     if end_date < start_date:
         st.warning("조회 종료 날짜가 시작 날짜보다 빠릅니다. 범위를 다시 설정해주세요.")
-        return []
-
-    # 서버로 보낼 페이로드: 날짜/시간을 분리해서 전송
-    data = {
-        "student_id": student_id,
-        "start_date": start_date.isoformat(),               # YYYY-MM-DD
-        "end_date":   end_date.isoformat(),                 # YYYY-MM-DD
-        "start_time": start_time.strftime("%H:%M:%S"),      # HH:MM:SS
-        "end_time":   end_time.strftime("%H:%M:%S"),        # HH:MM:SS
-    }
+        return None
 
-    try:
-        with st.spinner("출석 데이터 조회 중..."):
-            resp = requests.post(ATTEND_API, data=data, timeout=30)
-        if not resp.ok:
-            st.error(f"서버 오류: {resp.status_code} {resp.text}")
-            return []
-        payload = resp.json()
-        rows = payload.get("rows", [])
-        return rows
-    except requests.exceptions.RequestException as e:
-        st.error(f"네트워크 오류: {e}")
-        return []
+    # 캐시에 없는 달만 서버에 요청 (월 단위로 받아서 캐시), 받은 달부터 바로 그린다
+    return attendance.iter_months(student_id, start_date, end_date, start_time, end_time, month_cache)
 
 # ---------------------------
 # 3️⃣ 달력 렌더링
 # ---------------------------
-def render_calendar(start_date: dt.date, end_date: dt.date, attend_rows: list):
-    """
-    timestamp에서 초는 제거하고 (시:분)까지만 사용,
-    같은 날짜에 여러 출석 기록이 있으면 1회만 표시.
-    """
-    # 출석 데이터 전처리
-    attendance = {}
-    for row in attend_rows:
-        ts = row.get("timestamp")
-        if not ts:
-            continue
-        # 2025-11-03 17:23:37 → 날짜 + 시:분
-        date_part, time_part = ts.split(" ")
-        hour, minute = time_part.split(":")[:2]
-        display_time = f"{hour}:{minute}"
-        d = dt.date.fromisoformat(date_part)
-        # 중복 제거
-        if d not in attendance:
-            attendance[d] = []
-        if display_time not in attendance[d]:
-            attendance[d].append(display_time)
-
+def render_calendar_style():
     st.markdown("""
         <style>
         .cal-wrap { margin: 1rem 0 2rem 0; }
@@ -109,50 +73,44 @@ def render_calendar(start_date: dt.date, end_date: dt.date, attend_rows: list):
         </style>
     """, unsafe_allow_html=True)
 
-    week_headers = ["월", "화", "수", "목", "금", "토", "일"]
-
-    # start~end 사이 월 단위 반복
-    first = start_date.replace(day=1)
-    last = end_date.replace(day=1)
-    y, m = first.year, first.month
-
-    while (y < last.year) or (y == last.year and m <= last.month):
-        st.markdown(f"<div class='cal-wrap'><div class='cal-title'>📆 {y}년 {m}월</div>", unsafe_allow_html=True)
-        cal = calendar.Calendar(firstweekday=0)
-        month_days = cal.monthdayscalendar(y, m)
 
-        # 헤더
-        head_html = "<div class='cal-row'>" + "".join(
-            f"<div class='cal-cell cal-head'>{w}</div>" for w in week_headers
-        ) + "</div>"
-        st.markdown(head_html, unsafe_allow_html=True)
+def render_month(y, m, start_date: dt.date, end_date: dt.date, attend_times: dict):
+    """
+    한 달을 그린다. attend_times: {날짜: ["HH:MM", ...]} (attendance.day_times,
+    초는 제거하고 같은 날짜의 같은 시:분은 1회만)
+    """
+    week_headers = ["월", "화", "수", "목", "금", "토", "일"]
 
-        # 날짜 렌더링
-        rows_html = ""
-        for week in month_days:
-            rows_html += "<div class='cal-row'>"
-            for day in week:
-                if day == 0:
-                    rows_html += "<div class='cal-cell cal-day-off'>&nbsp;</div>"
+    st.markdown(f"<div class='cal-wrap'><div class='cal-title'>📆 {y}년 {m}월</div>", unsafe_allow_html=True)
+    cal = calendar.Calendar(firstweekday=0)
+    month_days = cal.monthdayscalendar(y, m)
+
+    # 헤더
+    head_html = "<div class='cal-row'>" + "".join(
+        f"<div class='cal-cell cal-head'>{w}</div>" for w in week_headers
+    ) + "</div>"
+    st.markdown(head_html, unsafe_allow_html=True)
+
+    # 날짜 렌더링
+    rows_html = ""
+    for week in month_days:
+        rows_html += "<div class='cal-row'>"
+        for day in week:
+            if day == 0:
+                rows_html += "<div class='cal-cell cal-day-off'>&nbsp;</div>"
+            else:
+                d = dt.date(y, m, day)
+                # 기간 밖
+                if d < start_date or d > end_date:
+                    rows_html += f"<div class='cal-cell cal-day-off'>{day}</div>"
                 else:
-                    d = dt.date(y, m, day)
-                    # 기간 밖
-                    if d < start_date or d > end_date:
-                        rows_html += f"<div class='cal-cell cal-day-off'>{day}</div>"
+                    if d in attend_times:
+                        times_html = "<br>".join(attend_times[d])
+                        rows_html += f"<div class='cal-cell cal-day-on'>{day}<div class='time-list'>{times_html}</div></div>"
                     else:
-                        if d in attendance:
-                            times_html = "<br>".join(attendance[d])
-                            rows_html += f"<div class='cal-cell cal-day-on'>{day}<div class='time-list'>{times_html}</div></div>"
-                        else:
-                            rows_html += f"<div class='cal-cell'>{day}</div>"
-            rows_html += "</div>"
-        st.markdown(rows_html + "</div>", unsafe_allow_html=True)
-
-        if m == 12:
-            y += 1
-            m = 1
-        else:
-            m += 1
+                        rows_html += f"<div class='cal-cell'>{day}</div>"
+        rows_html += "</div>"
+    st.markdown(rows_html + "</div>", unsafe_allow_html=True)
 
 # ---------------------------
 # 4️⃣ 실행 흐름
@@ -161,7 +119,33 @@ if submitted:
     if not student_id:
         st.error("학번은 필수입니다.")
     else:
-        rows = fetch_attendance(student_id, start_date, end_date, start_time, end_time)
-        if rows:
-            st.success(f"총 {len(rows)}건의 출석 데이터 수신 ✅")
-        render_calendar(start_date, end_date, rows)
+        months = fetch_attendance(student_id, start_date, end_date, start_time, end_time)
+        if months is not None:
+            summary = st.container()        # 요약/내보내기는 달력 위에 (다 받은 뒤 채움)
+            render_calendar_style()
+            # 달마다 받은 즉시 그리고, 내보내기용으로는 Arrow 배치만 남긴다 (dict rows 는 버림)
+            batches, total, cached, fetched = [], 0, 0, 0
+            try:
+                for (y, m), rows, hit in months:
+                    cached += hit
+                    fetched += not hit
+                    with metrics.timer("render"):
+                        render_month(y, m, start_date, end_date, attendance.day_times(rows))
+                    if rows:
+                        total += len(rows)
+                        batches.extend(attendance.iter_record_batches(attendance.iter_timestamps({student_id: rows})))
+            except requests.exceptions.HTTPError as e:
+                summary.error(f"서버 오류: {e.response.status_code} {e.response.text}")
+            except requests.exceptions.RequestException as e:
+                summary.error(f"네트워크 오류: {e}")
+            summary.caption(f"캐시 {cached}개월 · 서버 요청 {fetched}개월")
+            if total:
+                summary.success(f"총 {total}건의 출석 데이터 수신 ✅")
+                ext, mime = attendance.EXPORT_FORMATS[export_fmt]
+                summary.download_button(
+                    f"⬇️ {export_fmt} 로 내보내기",
+                    attendance.export_attendance(batches, export_fmt),
+                    file_name=f"attendance_{student_id}_{start_date}_{end_date}.{ext}",
+                    mime=mime,
+                    on_click="ignore",
+                )
@@ -0,0 +1,60 @@
+import datetime as dt
+
+import streamlit as st
+
+import metrics
+import outbox
+from config import BACK_OUTBOX
+
+st.title("📮 전송 대기열")
+st.caption("등록/식별 요청은 먼저 이 대기열에 기록된 뒤 백그라운드에서 백엔드로 전송됩니다. "
+           "일시적인 오류는 자동으로 다시 보내고, 횟수를 넘기면 실패로 남습니다.")
+
+metrics.set_page("outbox")
+
+if not BACK_OUTBOX:
+    st.info("BACK_OUTBOX=1 로 실행하면 요청이 대기열을 거쳐 전송됩니다. (현재는 바로 전송)")
+
+queue = outbox.get_outbox()
+
+c1, c2, c3 = st.columns(3)
+if c1.button("지금 전송"):
+    queue.flush_now()
+if c2.button("실패 항목 다시 보내기"):
+    st.toast(f"{queue.retry_failed()}건을 다시 대기열에 넣었습니다.")
+if c3.button("완료 항목 정리"):
+    st.toast(f"{queue.purge_done()}건을 삭제했습니다.")
+
+statuses = st.multiselect(
+    "표시할 상태", list(outbox.STATUS_LABELS), default=[outbox.PENDING, outbox.SENDING, outbox.FAILED],
+    format_func=outbox.STATUS_LABELS.get,
+)
+
+
+@st.fragment(run_every=2)
+def render_queue():
+    depth = queue.depth()
+    cols = st.columns(4)
+    for col, status in zip(cols, outbox.STATUS_LABELS):
+        col.metric(outbox.STATUS_LABELS[status], depth.get(status, 0))
+
+    rows = []
+    for item in queue.items(statuses):
+        rows.append({
+            "접수": dt.datetime.fromtimestamp(item["created_at"]).strftime("%m-%d %H:%M:%S"),
+            "경로": item["endpoint"],
+            "학번": (item["data"] or {}).get("student_id", ""),
+            "상태": outbox.STATUS_LABELS[item["status"]],
+            "시도": item["attempts"],
+            "다음 전송": dt.datetime.fromtimestamp(item["next_at"]).strftime("%H:%M:%S")
+            if item["status"] == outbox.PENDING else "",
+            "HTTP": item["http_status"],
+            "오류": item["error"] or "",
+        })
+    if rows:
+        st.dataframe(rows, width="stretch", hide_index=True)
+    else:
+        st.caption("표시할 항목이 없습니다.")
+
+
+render_queue()
@@ -0,0 +1,48 @@
+import hashlib
+import threading
+import time
+
+import streamlit as st
+from cachetools import TTLCache
+
+import metrics
+from config import RESULT_CACHE_TTL, RESULT_CACHE_SIZE
+
+
+def content_key(endpoint, content, extra=None):
+    # (엔드포인트, 이미지 SHA-256, 추가 폼 값) 으로 캐시 키 생성
+    digest = hashlib.sha256(content).hexdigest()
+    if extra:
+        return f"{endpoint}:{digest}:{sorted(extra.items())}"
+    return f"{endpoint}:{digest}"
+
+
+class ResultCache:
+    """TTL + LRU 크기 제한이 있는 응답 캐시. 세션 간 공유되므로 lock 으로 보호한다."""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # (응답, 경과 초) 또는 None
+        with self._lock:
+            entry = self._cache.get(key)
+        metrics.get_metrics().inc("app_result_cache_total", outcome="miss" if entry is None else "hit")
+        if entry is None:
+            return None
+        value, stored_at = entry
+        return value, time.time() - stored_at
+
+    def put(self, key, value):
+        with self._lock:
+            self._cache[key] = (value, time.time())
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    return ResultCache()
@@ -0,0 +1,203 @@
+"""
+실시간 카메라 프레임 전송 채널.
+
+세션마다 WebSocket 연결 하나를 유지하고, 프레임을 응답을 기다리지 않고 연속으로 보낸 뒤
+결과는 읽기 루프에서 비동기로 받아 시퀀스 번호로 짝을 맞춘다.
+
+프로토콜 (ws://BACK_URL/ws/<endpoint>)
+  요청: binary = 4바이트 big-endian 시퀀스 번호 + JPEG 바이트
+  응답: text   = {"seq": n, "status": 200|204|..., "result": {...}}
+
+연결할 수 없으면 기존 multipart POST 로 자동 폴백한다.
+"""
+import asyncio
+import json
+import logging
+import struct
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from tornado.websocket import websocket_connect
+
+import api_client
+import circuit_breaker
+from config import BACK_URL, BACK_WS_URL, BACK_STREAM, BACK_FRAME_BATCH
+
+log = logging.getLogger(__name__)
+
+
+def ws_url_for(endpoint):
+    base = (BACK_WS_URL or BACK_URL.replace("https://", "wss://").replace("http://", "ws://")).rstrip("/")
+    return f"{base}/ws{endpoint}"
+
+
+class StreamChannel:
+    """WebSocket 연결 하나와 그 연결을 돌리는 전용 이벤트 루프 스레드"""
+
+    def __init__(self, url, connect_timeout=3.0):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.connected = False
+        self._conn = None
+        self._seq = 0
+        self._pending = {}              # seq -> Future
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="stream-channel", daemon=True)
+        self._thread.start()
+
+    def connect(self):
+        asyncio.run_coroutine_threadsafe(self._connect(), self._loop).result(self.connect_timeout + 1)
+
+    async def _connect(self):
+        self._conn = await asyncio.wait_for(websocket_connect(self.url), self.connect_timeout)
+        self.connected = True
+        self._loop.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        while True:
+            msg = await self._conn.read_message()
+            if msg is None:
+                break
+            reply = json.loads(msg)
+            with self._lock:
+                fut = self._pending.pop(reply.get("seq"), None)
+            if fut is not None and not fut.done():
+                fut.set_result((reply.get("status", 200), reply.get("result")))
+        self.connected = False
+        self._fail_pending(ConnectionError("stream closed"))
+
+    def _fail_pending(self, exc):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def _write(self, message):
+        await self._conn.write_message(message, binary=True)
+
+    def request(self, payload, timeout):
+        # 응답을 기다리는 동안에도 다른 스레드는 같은 연결로 계속 보낼 수 있다 (파이프라이닝)
+        # 쓰기와 응답 대기가 timeout 하나를 나눠 쓴다 (합쳐서 timeout 을 넘지 않음)
+        deadline = time.monotonic() + timeout
+        fut = Future()
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._pending[seq] = fut
+        try:
+            message = struct.pack(">I", seq) + payload
+            try:
+                asyncio.run_coroutine_threadsafe(self._write(message), self._loop).result(max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                self.connected = False
+                raise ConnectionError(e) from e
+            return fut.result(max(0.0, deadline - time.monotonic()))
+        finally:
+            with self._lock:
+                self._pending.pop(seq, None)
+
+    async def _shutdown(self):
+        if self._conn is not None:
+            self._conn.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._loop.shutdown_default_executor()     # 주소 조회에 쓰인 스레드까지 정리
+
+    def close(self):
+        # 연결을 닫고 읽기 루프를 정리한 뒤 이벤트 루프와 스레드까지 끝낸다 (재실행마다 스레드가 쌓이지 않게)
+        self.connected = False
+        if self._thread.is_alive():
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(1.0)
+            except Exception as e:
+                log.debug("스트리밍 채널 정리 중 오류: %s", e)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=1.0)
+        if not self._thread.is_alive() and not self._loop.is_closed():
+            self._loop.close()
+        self._fail_pending(ConnectionError("stream closed"))
+
+
+class FrameTransport:
+    """
+    프레임 한 장을 보내고 (status_code, result) 를 돌려준다.
+    use_stream 이면 WebSocket 을 우선 사용하고, 연결이 안 되면 retry_after 초 동안 POST 로 보낸다.
+    use_batch 면 다른 세션의 프레임과 묶어 보낸다 (frame_batcher).
+    """
+
+    def __init__(self, endpoint, use_stream=BACK_STREAM, retry_after=10.0, use_batch=BACK_FRAME_BATCH):
+        self.endpoint = endpoint
+        self.use_stream = use_stream
+        self.use_batch = use_batch
+        self.retry_after = retry_after
+        self._channel = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def _stream(self):
+        with self._lock:
+            if self._channel is not None and self._channel.connected:
+                return self._channel
+            if time.monotonic() < self._retry_at:
+                return None
+            if self._channel is not None:
+                self._channel.close()
+            channel = StreamChannel(ws_url_for(self.endpoint))
+            try:
+                channel.connect()
+            except Exception as e:
+                log.warning("스트리밍 연결 실패, HTTP POST 로 전송: %s", e)
+                channel.close()
+                self._channel = None
+                self._retry_at = time.monotonic() + self.retry_after
+                return None
+            self._channel = channel
+            return channel
+
+    def predict(self, jpeg, timeout):
+        # timeout 안에 답이 없으면 DeadlineExceeded. 늦게 온 응답은 버린다
+        if self.use_batch:
+            import frame_batcher
+            try:
+                return frame_batcher.get_frame_batcher().predict(self.endpoint, jpeg, timeout)
+            except FutureTimeout:
+                raise api_client.DeadlineExceeded(f"{self.endpoint}: {timeout}초 안에 응답 없음") from None
+
+        deadline_at = time.monotonic() + timeout
+        channel = self._stream() if self.use_stream else None
+        if channel is not None:
+            try:
+                with circuit_breaker.get_breaker().call() as call:
+                    try:
+                        result = channel.request(jpeg, timeout)
+                    except FutureTimeout:
+                        call.timed_out()
+                        raise api_client.DeadlineExceeded(f"{self.endpoint}: {timeout}초 안에 응답 없음") from None
+                    call.done(result[0] < 500)
+                    return result
+            except ConnectionError as e:
+                # 실패는 브레이커에 기록됐다 (반열림이었다면 다시 열려 아래 POST 도 CircuitOpenError)
+                log.warning("스트리밍 연결 끊김, HTTP POST 로 전송: %s", e)
+
+        response = api_client.post(
+            self.endpoint,
+            files={"file": ("frame.jpg", jpeg, "image/jpeg")},
+            deadline=deadline_at,
+        )
+        if not response.content:
+            return response.status_code, None
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, response.text
+
+    def close(self):
+        with self._lock:
+            if self._channel is not None:
+                self._channel.close()
+                self._channel = None
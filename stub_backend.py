@@ -0,0 +1,280 @@
+"""
+로컬 테스트용 가짜 백엔드.
+
+실제 FastAPI 서버 없이 페이지를 띄워볼 수 있도록 같은 경로/응답 형식을 흉내 낸다.
+지연 시간, 오류율, 응답 크기(얼굴 수, 하루 출석 기록 수)를 바꿔가며 성능을 확인할 수 있다.
+    python stub_backend.py --port 8000 --latency 0.2 --jitter 0.05 --error-rate 0.01 --faces 30
+    python stub_backend.py --attend-mode ndjson     # 출석 기록을 NDJSON 스트림(또는 paged: 페이지)으로 응답
+    BACK_URL=http://localhost:8000 streamlit run main.py
+"""
+import argparse
+import asyncio
+import collections
+import datetime as dt
+import json
+import random
+import struct
+import threading
+
+import tornado.httpserver
+import tornado.ioloop
+import tornado.netutil
+import tornado.web
+import tornado.websocket
+
+
+class Stub:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500, faces=2, rows_per_day=1,
+                 attend_ratio=0.8, attend_mode="json", page_size=500):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.faces = faces
+        self.rows_per_day = rows_per_day
+        self.attend_ratio = attend_ratio
+        self.attend_mode = attend_mode          # json(한 번에) / ndjson(스트림) / paged(next_cursor)
+        self.page_size = page_size
+        self.counts = collections.Counter()     # 엔드포인트별 요청 수
+        self.replies = {}                        # Idempotency-Key → (상태, 응답) : 같은 키는 다시 처리하지 않음
+
+    async def delay(self):
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter) if self.jitter else self.latency))
+
+    def should_fail(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    async def predict(self, many, image_bytes, delay=True):
+        if delay:
+            await self.delay()
+        if not image_bytes:
+            return 204, None
+        if many:
+            detail = []
+            for i in range(self.faces):
+                x, y = 10 + (i % 8) * 120, 10 + (i // 8) * 140
+                known = i % 3 != 2
+                detail.append({
+                    "student_id": f"S{i:04d}" if known else None,
+                    "student_name": f"student{i}" if known else "unknown",
+                    "score": 0.9 - (i % 10) * 0.03 if known else 0.12,
+                    "points": [x, y, x + 100, y + 120],
+                })
+            known = sum(d["student_name"] != "unknown" for d in detail)
+            return 200, {"known": known, "unknown": len(detail) - known, "detail": detail}
+        return 200, {"student_id": "S0001", "student_name": "stub", "score": 0.91}
+
+    def attendance_rows(self, student_id, start_date, end_date, start_time, end_time):
+        # 같은 (학번, 날짜) 는 항상 같은 결과가 나오도록 시드 고정
+        rows = []
+        lo = start_time.hour * 3600 + start_time.minute * 60 + start_time.second
+        hi = end_time.hour * 3600 + end_time.minute * 60 + end_time.second
+        d = start_date
+        while d <= end_date:
+            rng = random.Random(f"{student_id}/{d.isoformat()}")
+            if d.weekday() < 5 and rng.random() < self.attend_ratio:
+                for sec in sorted(rng.randint(lo, hi) for _ in range(self.rows_per_day)):
+                    rows.append({
+                        "student_id": student_id,
+                        "timestamp": f"{d.isoformat()} {sec // 3600:02d}:{sec // 60 % 60:02d}:{sec % 60:02d}",
+                    })
+            d += dt.timedelta(days=1)
+        return rows
+
+
+class StubHandler(tornado.web.RequestHandler):
+    def initialize(self, stub):
+        self.stub = stub
+
+    async def prepare(self):
+        self.stub.counts[self.request.path] += 1
+        await self.stub.delay()
+        if self.stub.should_fail():
+            self.send_error(self.stub.error_status)
+        else:
+            self.replay()
+
+    def replay(self):
+        # 이미 처리한 Idempotency-Key 면 저장된 응답을 그대로 돌려준다
+        key = self.request.headers.get("Idempotency-Key")
+        if key and key in self.stub.replies:
+            self.stub.counts["replayed"] += 1
+            status, result = self.stub.replies[key]
+            self.reply(status, result)
+            self.finish()
+
+    def reply(self, status, result):
+        key = self.request.headers.get("Idempotency-Key")
+        if key and status < 500:
+            self.stub.replies[key] = (status, result)
+        self.set_status(status)
+        if result is not None:
+            self.write(result)
+
+
+class PredictHandler(StubHandler):
+    def initialize(self, stub, many):
+        super().initialize(stub)
+        self.many = many
+
+    async def prepare(self):
+        # 지연은 predict 안에서 처리
+        self.stub.counts[self.request.path] += 1
+        if self.stub.should_fail():
+            self.send_error(self.stub.error_status)
+        else:
+            self.replay()
+
+    async def post(self):
+        files = self.request.files.get("file")
+        status, result = await self.stub.predict(self.many, files[0]["body"] if files else b"")
+        self.reply(status, result)
+
+
+class PredictBatchHandler(StubHandler):
+    async def post(self):
+        # 묶음 전체에 지연은 한 번만 (GPU 배치 추론 흉내)
+        many = self.get_body_argument("endpoint", "/predict") == "/predict_many"
+        results = []
+        for f in self.request.files.get("file", []):
+            status, result = await self.stub.predict(many, f["body"], delay=False)
+            results.append({"status": status, "result": result})
+        self.reply(200, {"results": results})
+
+
+class RegistHandler(StubHandler):
+    def post(self):
+        files = self.request.files.get("file")
+        if not files:
+            self.send_error(422)
+            return
+        self.reply(200, {
+            "student_id": self.get_body_argument("student_id"),
+            "student_name": self.get_body_argument("student_name"),
+            "bytes": len(files[0]["body"]),
+            "registered": True,
+        })
+
+
+class AttendanceMonthHandler(StubHandler):
+    async def post(self):
+        rows = self.stub.attendance_rows(
+            self.get_body_argument("student_id"),
+            dt.date.fromisoformat(self.get_body_argument("start_date")),
+            dt.date.fromisoformat(self.get_body_argument("end_date")),
+            dt.time.fromisoformat(self.get_body_argument("start_time", "00:00:00")),
+            dt.time.fromisoformat(self.get_body_argument("end_time", "23:59:59")),
+        )
+        mode = self.stub.attend_mode
+        if mode == "ndjson" and "application/x-ndjson" in self.request.headers.get("Accept", ""):
+            # 한 줄에 row 하나, page_size 줄마다 흘려 보낸다
+            self.set_header("Content-Type", "application/x-ndjson")
+            for i in range(0, len(rows), self.stub.page_size):
+                self.write("".join(json.dumps(r) + "\n" for r in rows[i:i + self.stub.page_size]))
+                await self.flush()
+        elif mode == "paged":
+            start = int(self.get_body_argument("cursor", "0"))
+            end = start + self.stub.page_size
+            self.write({"rows": rows[start:end], "next_cursor": str(end) if end < len(rows) else None})
+        else:
+            self.write({"rows": rows})
+
+
+class AttendanceDebugHandler(StubHandler):
+    def post(self):
+        sid = self.get_body_argument("student_id")
+        today = dt.date.today()
+        rows = self.stub.attendance_rows(sid, today - dt.timedelta(days=7), today, dt.time(0), dt.time(23, 59, 59))
+        self.write({"student_id": sid, "rows": rows[-5:]})
+
+
+class PredictSocket(tornado.websocket.WebSocketHandler):
+    def initialize(self, stub, many):
+        self.stub = stub
+        self.many = many
+
+    def on_message(self, message):
+        # 응답을 기다리지 않고 다음 프레임을 받을 수 있도록 프레임마다 별도 작업으로 처리
+        tornado.ioloop.IOLoop.current().spawn_callback(self._reply, message)
+
+    async def _reply(self, message):
+        self.stub.counts[self.request.path] += 1
+        seq = struct.unpack(">I", message[:4])[0]
+        status, result = await self.stub.predict(self.many, message[4:])
+        try:
+            await self.write_message(json.dumps({"seq": seq, "status": status, "result": result}))
+        except tornado.websocket.WebSocketClosedError:
+            pass
+
+
+def make_app(stub, quiet=False):
+    # quiet: 요청마다 찍히는 access 로그 끄기
+    settings = {"log_function": lambda handler: None} if quiet else {}
+    return tornado.web.Application([
+        (r"/regist", RegistHandler, {"stub": stub}),
+        (r"/predict", PredictHandler, {"stub": stub, "many": False}),
+        (r"/predict_many", PredictHandler, {"stub": stub, "many": True}),
+        (r"/predict_batch", PredictBatchHandler, {"stub": stub}),
+        (r"/attendance_month", AttendanceMonthHandler, {"stub": stub}),
+        (r"/attendance_debug", AttendanceDebugHandler, {"stub": stub}),
+        (r"/ws/predict", PredictSocket, {"stub": stub, "many": False}),
+        (r"/ws/predict_many", PredictSocket, {"stub": stub, "many": True}),
+    ], **settings)
+
+
+def start_in_thread(stub, port=0):
+    """
+    백그라운드 스레드에서 서버를 띄우고 (port, stop) 을 돌려준다. port=0 이면 빈 포트 사용.
+    벤치마크처럼 같은 프로세스 안에서 가짜 백엔드가 필요할 때 사용한다.
+    """
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        sockets = tornado.netutil.bind_sockets(port, "127.0.0.1")
+        server = tornado.httpserver.HTTPServer(make_app(stub, quiet=True))
+        server.add_sockets(sockets)
+        state["port"] = sockets[0].getsockname()[1]
+        state["loop"] = tornado.ioloop.IOLoop.current()
+        state["server"] = server
+        ready.set()
+        state["loop"].start()
+
+    threading.Thread(target=run, name="stub-backend", daemon=True).start()
+    ready.wait()
+
+    def stop():
+        state["loop"].add_callback(state["server"].stop)
+        state["loop"].add_callback(state["loop"].stop)
+
+    return state["port"], stop
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 평균(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="응답 지연 표준편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument("--error-status", type=int, default=500, help="오류 응답 상태 코드")
+    parser.add_argument("--faces", type=int, default=2, help="/predict_many 응답 얼굴 수")
+    parser.add_argument("--rows-per-day", type=int, default=1, help="출석한 날 하루 기록 수")
+    parser.add_argument("--attend-mode", choices=["json", "ndjson", "paged"], default="json",
+                        help="출석 기록 응답 형식")
+    parser.add_argument("--page-size", type=int, default=500, help="ndjson/paged 한 번에 보내는 기록 수")
+
+
+def stub_from_args(args):
+    return Stub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                error_status=args.error_status, faces=args.faces, rows_per_day=args.rows_per_day,
+                attend_mode=args.attend_mode, page_size=args.page_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 가짜 백엔드")
+    parser.add_argument("--port", type=int, default=8000)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    make_app(stub_from_args(args)).listen(args.port)
+    print(f"stub backend listening on http://localhost:{args.port}")
+    tornado.ioloop.IOLoop.current().start()
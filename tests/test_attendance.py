@@ -0,0 +1,26 @@
+import datetime as dt
+
+import attendance
+
+
+def test_day_times_accepts_fractional_and_iso_timestamps():
+    rows = [
+        {"timestamp": "2025-11-03 08:01:02"},
+        {"timestamp": "2025-11-03 17:23:37.123456"},
+        {"timestamp": "2025-11-04T09:15:00"},
+        {"timestamp": "2025-11-04T09:15:30.5+09:00"},
+    ]
+    assert attendance.day_times(rows) == {
+        dt.date(2025, 11, 3): ["08:01", "17:23"],
+        dt.date(2025, 11, 4): ["09:15"],
+    }
+
+
+def test_unparseable_timestamps_are_skipped():
+    rows = [{"timestamp": "2025-11-03 08:01:02"}, {"timestamp": "not a time"}]
+    assert attendance.day_times(rows) == {dt.date(2025, 11, 3): ["08:01"]}
+
+    batch, = attendance.iter_record_batches([("S1", "2025-11-03T08:01:02.5"), ("S2", "garbage")])
+    assert batch.num_rows == 1
+    assert batch.column("student_id").to_pylist() == ["S1"]
+    assert batch.column("date").to_pylist() == [dt.date(2025, 11, 3)]
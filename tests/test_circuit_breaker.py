@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+import circuit_breaker
+import stream_transport
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+def tripped(**kwargs):
+    breaker = CircuitBreaker(window=30, min_calls=2, error_rate=0.5, slow_seconds=5, slow_rate=0.5,
+                             cooldown=0.05, probes=1, **kwargs)
+    for _ in range(2):
+        with breaker.call() as call:
+            call.done(False)
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_open_rejects_until_cooldown():
+    breaker = tripped()
+    with pytest.raises(CircuitOpenError):
+        with breaker.call():
+            pass
+    time.sleep(0.06)
+    with breaker.call() as call:
+        assert breaker.state == HALF_OPEN
+        call.done(True)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_released_on_exception():
+    breaker = tripped()
+    time.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        with breaker.call():
+            raise ConnectionError("stream closed")
+    assert breaker.state == OPEN
+    assert breaker._probing == 0
+    time.sleep(0.06)
+    with breaker.call() as call:
+        call.done(True)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_only_probes_decide():
+    breaker = CircuitBreaker(min_calls=2, cooldown=0.05, probes=1)
+    with breaker.call() as early:           # 열리기 전에 시작한 요청
+        for _ in range(2):
+            with breaker.call() as call:
+                call.done(False)
+        time.sleep(0.06)
+        with breaker.call() as probe:
+            with pytest.raises(CircuitOpenError):
+                with breaker.call():
+                    pass
+            early.done(True)
+            probe.done(False)
+    assert breaker.state == OPEN
+
+
+def test_deadline_timeouts_are_not_errors():
+    breaker = CircuitBreaker(min_calls=2, error_rate=0.5, slow_seconds=5)
+    for _ in range(5):
+        with breaker.call() as call:
+            call.timed_out()
+    assert breaker.state == CLOSED
+
+
+def test_stream_failure_in_half_open_does_not_leak_probe(monkeypatch):
+    breaker = tripped()
+    monkeypatch.setattr(circuit_breaker, "get_breaker", lambda: breaker)
+
+    class BrokenChannel:
+        def request(self, payload, timeout):
+            raise ConnectionError("stream closed")
+
+    transport = stream_transport.FrameTransport("/predict", use_stream=True, use_batch=False)
+    monkeypatch.setattr(transport, "_stream", lambda: BrokenChannel())
+    time.sleep(0.06)
+    with pytest.raises(CircuitOpenError):       # 시험 요청 실패로 다시 열려 POST 폴백도 보내지 않음
+        transport.predict(b"jpeg", timeout=1.0)
+    assert breaker.state == OPEN
+    assert breaker._probing == 0
+    time.sleep(0.06)
+    with breaker.call() as call:
+        call.done(True)
+    assert breaker.state == CLOSED